@@ -0,0 +1,245 @@
+"""Async versions of read-only blog views.
+
+Routed instead of their counterparts from `blog.views` when
+`BLOG_ASYNC_VIEWS` setting is enabled. Views query the database with
+async ORM, so under ASGI a request doesn't hop to the thread executor
+for every query. Caching and pagination are shared with the sync views
+through `blog.mixins`.
+"""
+
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.db.models import Model, QuerySet
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import render
+from django.views import View
+
+from blog import feeds
+from blog.cache import aget_page_cache_key
+from blog.constants import COMMENTS_ON_PAGE, POSTS_ON_PAGE
+from blog.forms import CommentForm
+from blog.mixins import (
+    CursorPaginationMixin,
+    FeedPaginationMixin,
+    MaterializedFeedMixin,
+    PageCacheMixin,
+)
+from blog.models import Category, Post
+from blog.paginators import CommentPaginator, CursorPaginator, FeedPaginator
+
+User = get_user_model()
+
+
+async def aload_user(request: HttpRequest) -> None:
+    """Evaluate lazy `request.user`.
+
+    Loading session and user has no async API in Django 4.2, so it is
+    done once in executor, after that the user is safe to use in async
+    code and templates.
+    """
+    await sync_to_async(getattr)(request.user, 'is_authenticated')
+
+
+async def aget_object_or_404(queryset: QuerySet, **kwargs) -> Model:
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist as exc:
+        raise Http404(
+            f'No {queryset.model._meta.object_name} matches the given query.'
+        ) from exc
+
+
+class AsyncPageView(PageCacheMixin, View):
+    """Async page, HTML of which is cached for anonymous users.
+
+    Subclasses list version scopes of the page in `get_page_cache_scopes`
+    and build template context in `get_context_data`. Templates are
+    rendered in executor, as rendering reads post cards from cache.
+    """
+
+    template_name: str
+
+    async def get_page_cache_scopes(self) -> list[tuple[str, int]] | None:
+        raise NotImplementedError
+
+    async def get_context_data(self) -> dict[str, Any]:
+        raise NotImplementedError
+
+    async def render_page(self) -> HttpResponse:
+        context = await self.get_context_data()
+        context['view'] = self
+        return await sync_to_async(render)(
+            self.request, self.template_name, context
+        )
+
+    async def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        await aload_user(request)
+        self.page_cache_scopes = await self.get_page_cache_scopes()
+        if request.user.is_authenticated or self.page_cache_scopes is None:
+            return await self.render_page()
+
+        key = await aget_page_cache_key(
+            self.get_page_cache_name(), self.page_cache_scopes
+        )
+        content = await cache.aget(key)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = await self.render_page()
+        timeout = await self.aget_page_cache_timeout()
+        if timeout:
+            await cache.aset(key, response.content, timeout)
+        return response
+
+
+class AsyncFeedView(
+    MaterializedFeedMixin,
+    CursorPaginationMixin,
+    FeedPaginationMixin,
+    AsyncPageView,
+):
+    """Async paginated feed of posts, paginated as the sync feed views."""
+
+    paginate_by = POSTS_ON_PAGE
+
+    def get_queryset(self) -> QuerySet[Any]:
+        raise NotImplementedError
+
+    async def paginate_queryset(self, queryset: QuerySet) -> tuple:
+        if self.cursor_pagination:
+            try:
+                paginator = CursorPaginator(
+                    queryset, self.paginate_by, self.cursor_keys
+                )
+                page = await paginator.apage(
+                    after=self.request.GET.get('after'),
+                    before=self.request.GET.get('before'),
+                )
+            except ValueError as exc:
+                raise Http404('Неверный курсор страницы.') from exc
+            return None, page
+
+        paginator = FeedPaginator(
+            queryset, self.paginate_by, **await self.aget_paginator_kwargs()
+        )
+        page_number = self.request.GET.get('page') or 1
+        if page_number == 'last':
+            await paginator.acount()
+            page_number = paginator.num_pages
+        try:
+            page = await paginator.apage(page_number)
+        except InvalidPage as exc:
+            raise Http404('Неверный номер страницы.') from exc
+        return paginator, page
+
+    async def get_context_data(self) -> dict[str, Any]:
+        paginator, page = await self.paginate_queryset(self.get_queryset())
+        return {
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': page.object_list,
+        }
+
+
+class Index(AsyncFeedView):
+    template_name = 'blog/index.html'
+
+    async def get_page_cache_scopes(self) -> list[tuple[str, int | None]]:
+        return [('feed', None)]
+
+    def get_scheduled_posts(self) -> QuerySet[Any]:
+        return Post.objects.get_scheduled()
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return Post.objects.for_cards().get_published()
+
+
+class PostDetail(AsyncPageView):
+    template_name = 'blog/detail.html'
+    page_cache_params = ('comments_page',)
+
+    async def get_page_cache_scopes(self) -> list[tuple[str, int | None]]:
+        return [('post', self.kwargs['post_id'])]
+
+    async def get_context_data(self) -> dict[str, Any]:
+        post = await aget_object_or_404(
+            Post.objects.for_detail().get_all_for_user(self.request.user),
+            pk=self.kwargs['post_id'],
+        )
+        context = {
+            'object': post,
+            'post': post,
+            'comments': await CommentPaginator(
+                post, COMMENTS_ON_PAGE
+            ).aget_page(self.request.GET.get('comments_page')),
+        }
+        if not self.request.user.is_anonymous:
+            context['form'] = CommentForm()
+        return context
+
+
+class ViewProfile(AsyncFeedView):
+    template_name = 'blog/profile.html'
+
+    async def get_page_cache_scopes(self) -> list[tuple[str, int]] | None:
+        self.profile = await User.objects.filter(
+            username=self.kwargs['username']
+        ).afirst()
+        if self.profile is None:
+            return None
+        return [('author-feed', self.profile.pk)]
+
+    def get_scheduled_posts(self) -> QuerySet[Any]:
+        return Post.objects.get_scheduled().filter(author=self.profile)
+
+    def get_count_cache_name(self) -> str:
+        # Profile owner also sees their unpublished posts.
+        is_owner = self.request.user.username == self.kwargs['username']
+        return f'{super().get_count_cache_name()}:{is_owner}'
+
+    def get_queryset(self) -> QuerySet[Any]:
+        posts = Post.objects.for_cards()
+        if feeds.is_enabled() and self.request.user != self.profile:
+            return self.read_feed(posts, feeds.author_scope(self.profile.pk))
+        return posts.get_author_posts(self.profile, self.request.user)
+
+    async def get_context_data(self) -> dict[str, Any]:
+        if self.profile is None:
+            raise Http404('Пользователь не найден.')
+        context = await super().get_context_data()
+        context['profile'] = self.profile
+        return context
+
+
+class CategoryPosts(AsyncFeedView):
+    template_name = 'blog/category.html'
+
+    async def get_page_cache_scopes(self) -> list[tuple[str, int]] | None:
+        self.category = await Category.objects.filter(
+            is_published=True, slug=self.kwargs['category_slug']
+        ).afirst()
+        if self.category is None:
+            return None
+        return [('category-feed', self.category.pk)]
+
+    def get_scheduled_posts(self) -> QuerySet[Any]:
+        return Post.objects.get_scheduled().filter(category=self.category)
+
+    def get_queryset(self) -> QuerySet[Any]:
+        posts = Post.objects.for_cards()
+        if feeds.is_enabled():
+            scope = feeds.category_scope(self.category.pk)
+            return self.read_feed(posts, scope)
+        return posts.get_published().filter(category=self.category)
+
+    async def get_context_data(self) -> dict[str, Any]:
+        if self.category is None:
+            raise Http404('Категория не найдена.')
+        context = await super().get_context_data()
+        context['category'] = self.category
+        return context
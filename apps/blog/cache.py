@@ -0,0 +1,179 @@
+import hashlib
+import time
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import SafeString, mark_safe
+
+from blog.constants import POST_CARD_CACHE_TIMEOUT
+from blog.models import Post
+
+
+class CacheStats:
+    """Hit and miss counters of a cache in the current process."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+post_card_stats = CacheStats()
+
+
+def _version_key(kind: str, pk: int | None) -> str:
+    return f'blog:version:{kind}:{pk}'
+
+
+def bump_version(kind: str, pk: int | None) -> None:
+    """Invalidate cached fragments which depend on the object."""
+    key = _version_key(kind, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_versions(*objects: tuple[str, int | None]) -> list[int]:
+    """Fetch version stamps of the objects.
+
+    Stamp of an object which was never bumped (or evicted from cache) is
+    initialized with current time, so it can't match any older stamp.
+    """
+    keys = [_version_key(kind, pk) for kind, pk in objects]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(*objects: tuple[str, int | None]) -> list[int]:
+    """Async version of `get_versions`."""
+    keys = [_version_key(kind, pk) for kind, pk in objects]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_post_pages(
+    post_id: int,
+    author_ids: set[int | None],
+    category_ids: set[int | None],
+) -> None:
+    """Drop cached card of the post and cached pages listing it."""
+    bump_version('post', post_id)
+    bump_version('feed', None)
+    for author_id in author_ids - {None}:
+        bump_version('author-feed', author_id)
+    for category_id in category_ids - {None}:
+        bump_version('category-feed', category_id)
+
+
+def get_versioned_key(
+    prefix: str, name: str, scopes: list[tuple[str, int | None]]
+) -> str:
+    """Build cache key, which changes when any of scopes is bumped.
+
+    Every key also depends on `pages` scope, which is bumped on rare
+    changes visible everywhere (categories, locations, usernames).
+    """
+    versions = get_versions(('pages', None), *scopes)
+    return _format_versioned_key(prefix, name, versions)
+
+
+async def aget_versioned_key(
+    prefix: str, name: str, scopes: list[tuple[str, int | None]]
+) -> str:
+    """Async version of `get_versioned_key`."""
+    versions = await aget_versions(('pages', None), *scopes)
+    return _format_versioned_key(prefix, name, versions)
+
+
+def _format_versioned_key(prefix: str, name: str, versions: list[int]) -> str:
+    name_hash = hashlib.md5(name.encode(), usedforsecurity=False).hexdigest()
+    return f'blog:{prefix}:{name_hash}:{".".join(map(str, versions))}'
+
+
+def get_page_cache_key(path: str, scopes: list[tuple[str, int | None]]) -> str:
+    return get_versioned_key('page', path, scopes)
+
+
+async def aget_page_cache_key(
+    path: str, scopes: list[tuple[str, int | None]]
+) -> str:
+    return await aget_versioned_key('page', path, scopes)
+
+
+def get_next_pub_dates(scheduled_posts: QuerySet) -> QuerySet:
+    """Return pub_date of the next scheduled post as a lazy queryset.
+
+    The queryset keeps its result once evaluated, so a page and its
+    paginator sharing it read the date with a single query.
+    """
+    return scheduled_posts.order_by('pub_date').values_list(
+        'pub_date', flat=True
+    )[:1]
+
+
+def get_scheduled_timeout(next_pub_dates: QuerySet, timeout: int) -> int:
+    """Cap cache timeout by time left until next scheduled publication.
+
+    A post whose pub_date has passed but which is not released yet
+    turns caching off until the release.
+    """
+    return _cap_timeout(next(iter(next_pub_dates), None), timeout)
+
+
+async def aget_scheduled_timeout(
+    next_pub_dates: QuerySet, timeout: int
+) -> int:
+    """Async version of `get_scheduled_timeout`."""
+    async for next_pub_date in next_pub_dates:
+        return _cap_timeout(next_pub_date, timeout)
+    return timeout
+
+
+def _cap_timeout(next_pub_date: datetime | None, timeout: int) -> int:
+    if next_pub_date is None:
+        return timeout
+    seconds_left = (next_pub_date - timezone.now()).total_seconds()
+    return max(0, min(timeout, int(seconds_left)))
+
+
+def render_post_card(post: Post) -> SafeString:
+    """Render `includes/post_card.html`, reusing cached HTML if possible.
+
+    Cache key contains version stamps of the post, its category, location
+    and author, which are bumped by signals when any of them changes.
+    """
+    versions = get_versions(
+        ('post', post.pk),
+        ('category', post.category_id),
+        ('location', post.location_id),
+        ('user', post.author_id),
+    )
+    key = f'blog:post-card:{post.pk}:{".".join(map(str, versions))}'
+
+    html = cache.get(key)
+    if html is None:
+        post_card_stats.misses += 1
+        html = render_to_string('includes/post_card.html', {'post': post})
+        cache.set(key, html, POST_CARD_CACHE_TIMEOUT)
+    else:
+        post_card_stats.hits += 1
+    return mark_safe(html)
@@ -1 +1,9 @@
 POSTS_ON_PAGE = 10
+COMMENTS_ON_PAGE = 50
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+PAGE_CACHE_TIMEOUT = 60 * 5
+POST_COUNT_CACHE_TIMEOUT = 60 * 60
+PAGES_AROUND_CURRENT = 2
+IMAGE_RENDITION_WIDTHS = (320, 640, 1280)
+# Words of post text stored as excerpt shown on feed cards.
+EXCERPT_WORDS = 10
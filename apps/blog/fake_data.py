@@ -0,0 +1,198 @@
+"""Synthetic blog content for benchmarks at production scale.
+
+Distributions follow a typical blog: a tenth of users write posts and a
+few of them write most, recent posts are more frequent than old ones and
+comment threads have a heavy tail. Some posts are scheduled or hidden
+and some categories are unpublished, so every feed filter has work.
+"""
+
+import random
+from collections.abc import Callable
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'gen-user-'
+CATEGORY_SLUG_PREFIX = 'gen-category-'
+AUTHOR_SHARE = 0.1
+CATEGORIES = 30
+LOCATIONS = 100
+HISTORY = timedelta(days=3 * 365)
+SCHEDULE_AHEAD = timedelta(days=30)
+SCHEDULED_SHARE = 0.02
+HIDDEN_POST_SHARE = 0.03
+HIDDEN_COMMENT_SHARE = 0.03
+NO_LOCATION_SHARE = 0.3
+# Pareto shape of thread sizes, the lower the heavier the tail.
+THREAD_SHAPE = 1.5
+MAX_THREAD_SIZE = 20_000
+
+VOCABULARY = (
+    'путешествие горы озеро поход город дорога лес река утро вечер фото'
+    ' маршрут привал палатка вершина перевал море берег поезд вокзал музей'
+    ' площадь улица кофе завтрак рюкзак карта погода дождь солнце ветер'
+    ' снег костёр друзья история красивый длинный тихий новый старый'
+    ' далёкий и в на с по через после мы шли видели'
+)
+WORDS = VOCABULARY.split()
+
+
+def zipf_cum_weights(count: int, exponent: float = 1.1) -> list[float]:
+    """Cumulative weights for `random.choices`, first items are hottest."""
+    return list(
+        accumulate(1 / (rank + 1) ** exponent for rank in range(count))
+    )
+
+
+def _sentence(rng: random.Random, min_words: int, max_words: int) -> str:
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return ' '.join(words).capitalize()
+
+
+def _thread_size(rng: random.Random, mean: float) -> int:
+    # Pareto variate minus one has mean 1 / (shape - 1).
+    size = (rng.paretovariate(THREAD_SHAPE) - 1) * mean * (THREAD_SHAPE - 1)
+    return min(MAX_THREAD_SIZE, round(size))
+
+
+def generate(
+    users: int,
+    posts: int,
+    comments: int,
+    seed: int = 0,
+    batch_size: int = 5000,
+    log: Callable[[str], None] = print,
+) -> dict[str, int]:
+    """Fill the database with synthetic users, posts and comments.
+
+    Objects are created with `bulk_create`, so no signals are sent.
+    Stored comment counters, excerpts and release flags are filled in
+    right away.
+    Generated data depends only on `seed`.
+
+    Args:
+        users: Count of users, a tenth of them write posts.
+        posts: Count of posts.
+        comments: Approximate count of comments.
+        seed: Seed of random generator.
+        batch_size: Count of posts inserted in one transaction.
+        log: Function reporting progress.
+
+    Returns:
+        Count of created objects by model name.
+
+    Raises:
+        ValueError: If synthetic data is already in the database.
+    """
+    if User.objects.filter(username=f'{USERNAME_PREFIX}0').exists():
+        raise ValueError('Synthetic data is already generated.')
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(None)
+
+    log(f'Creating {users} users...')
+    user_ids = []
+    for start in range(0, users, batch_size):
+        user_ids += [
+            user.pk
+            for user in User.objects.bulk_create(
+                User(username=f'{USERNAME_PREFIX}{i}', password=password)
+                for i in range(start, min(users, start + batch_size))
+            )
+        ]
+    author_ids = user_ids[: max(1, int(users * AUTHOR_SHARE))]
+
+    categories = Category.objects.bulk_create(
+        Category(
+            title=_sentence(rng, 1, 3),
+            slug=f'{CATEGORY_SLUG_PREFIX}{i}',
+            description=_sentence(rng, 5, 20),
+            is_published=i % 10 != 9,
+        )
+        for i in range(CATEGORIES)
+    )
+    locations = Location.objects.bulk_create(
+        Location(name=_sentence(rng, 1, 3)) for _ in range(LOCATIONS)
+    )
+
+    author_weights = zipf_cum_weights(len(author_ids))
+    commenter_weights = zipf_cum_weights(len(user_ids))
+    category_weights = zipf_cum_weights(len(categories))
+    thread_mean = comments / posts if posts else 0
+    created_comments = 0
+
+    log(f'Creating {posts} posts with about {comments} comments...')
+    for start in range(0, posts, batch_size):
+        batch = []
+        threads = []
+        for _ in range(min(batch_size, posts - start)):
+            if rng.random() < SCHEDULED_SHARE:
+                pub_date = now + SCHEDULE_AHEAD * rng.random()
+            else:
+                pub_date = now - HISTORY * rng.random() ** 2
+            thread = [
+                rng.random() >= HIDDEN_COMMENT_SHARE
+                for _ in range(_thread_size(rng, thread_mean))
+            ]
+            threads.append(thread)
+            title = _sentence(rng, 2, 8)
+            text = '\n\n'.join(
+                _sentence(rng, 20, 80) for _ in range(rng.randint(1, 5))
+            )
+            batch.append(
+                Post(
+                    title=title,
+                    text=text,
+                    excerpt=Post.make_excerpt(text),
+                    pub_date=pub_date,
+                    is_released=pub_date <= now,
+                    is_published=rng.random() >= HIDDEN_POST_SHARE,
+                    author_id=rng.choices(
+                        author_ids, cum_weights=author_weights
+                    )[0],
+                    category=rng.choices(
+                        categories, cum_weights=category_weights
+                    )[0],
+                    location=(
+                        None
+                        if rng.random() < NO_LOCATION_SHARE
+                        else rng.choice(locations)
+                    ),
+                    comment_count=sum(thread),
+                )
+            )
+
+        with transaction.atomic():
+            Post.objects.bulk_create(batch)
+            thread_comments = [
+                Comment(
+                    text=_sentence(rng, 3, 40),
+                    author_id=rng.choices(
+                        user_ids, cum_weights=commenter_weights
+                    )[0],
+                    post_id=post.pk,
+                    is_published=is_published,
+                )
+                for post, thread in zip(batch, threads, strict=True)
+                for is_published in thread
+            ]
+            Comment.objects.bulk_create(thread_comments, batch_size)
+        created_comments += len(thread_comments)
+        log(f'{start + len(batch)} posts, {created_comments} comments')
+
+    return {
+        'users': len(user_ids),
+        'categories': len(categories),
+        'locations': len(locations),
+        'posts': posts,
+        'comments': created_comments,
+    }
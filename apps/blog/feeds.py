@@ -0,0 +1,69 @@
+"""Materialized category and author feeds.
+
+`FeedEntry` lists posts visible in every category and author feed, so
+feed pages read a range of its index instead of checking each post,
+its category and the current time. Entries are used and maintained when
+`BLOG_FEED_ENTRIES` setting is enabled: `blog.signals` updates entries
+of saved posts and categories, scheduled posts are added once they are
+released by `blog.scheduling`. Bulk writes send no signals,
+`rebuild_feeds` command restores entries after them.
+"""
+
+from collections.abc import Iterator
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+
+from blog.models import FeedEntry, Post
+
+
+def is_enabled() -> bool:
+    return settings.BLOG_FEED_ENTRIES
+
+
+def category_scope(category_id: int) -> str:
+    return f'category:{category_id}'
+
+
+def author_scope(author_id: int) -> str:
+    return f'author:{author_id}'
+
+
+def _make_entries(posts: QuerySet, chunk_size: int) -> Iterator[FeedEntry]:
+    visible = (
+        posts.get_published()
+        .order_by()
+        .values_list('pk', 'pub_date', 'category_id', 'author_id')
+    )
+    for post_id, pub_date, category_id, author_id in visible.iterator(
+        chunk_size
+    ):
+        for scope in (category_scope(category_id), author_scope(author_id)):
+            yield FeedEntry(scope=scope, pub_date=pub_date, post_id=post_id)
+
+
+def sync_feed_entries(posts: QuerySet, batch_size: int = 2000) -> int:
+    """Replace feed entries of the posts according to their visibility.
+
+    Returns:
+        Count of created entries.
+    """
+    created = 0
+    with transaction.atomic():
+        FeedEntry.objects.filter(post__in=posts.values('pk')).delete()
+        entries = _make_entries(posts, batch_size)
+        while batch := list(islice(entries, batch_size)):
+            FeedEntry.objects.bulk_create(batch)
+            created += len(batch)
+    return created
+
+
+def rebuild_feeds(batch_size: int = 2000) -> int:
+    """Recreate entries of all feeds.
+
+    Returns:
+        Count of created entries.
+    """
+    return sync_feed_entries(Post.objects.all(), batch_size)
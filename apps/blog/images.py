@@ -0,0 +1,95 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from blog.cache import invalidate_post_pages
+from blog.constants import IMAGE_RENDITION_WIDTHS
+from blog.models import Post
+
+# Pillow format and save options for every rendition format.
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def rendition_name(name: str, width: int, extension: str) -> str:
+    """Name of the rendition file, stored next to the original image."""
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}_{width}w.{extension}'))
+
+
+def rendition_files(renditions: dict[str, list]) -> list[str]:
+    """Return names of all files listed in `Post.image_renditions`."""
+    return [name for files in renditions.values() for _, name in files]
+
+
+def delete_files(names: list[str]) -> None:
+    """Delete image files from the default storage, skipping missing."""
+    for name in names:
+        default_storage.delete(name)
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """Convert the image to RGB, filling transparent areas with white."""
+    if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _encode(image: Image.Image, extension: str) -> bytes:
+    image_format, options = RENDITION_FORMATS[extension]
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = _flatten(image)
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def create_renditions(post_id: int) -> dict[str, list]:
+    """Create downscaled WebP and JPEG copies of the post image.
+
+    Images are turned upright by their EXIF orientation first, JPEG
+    copies of transparent images get white background. Widths larger
+    than the original are skipped. Saved renditions are written to
+    `Post.image_renditions`, or deleted if the image was replaced in
+    the meantime.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return {}
+
+    storage = post.image.storage
+    with post.image.open('rb') as image_file, Image.open(image_file) as image:
+        # Renditions are saved without EXIF, so the orientation browsers
+        # apply to the original is applied to the pixels.
+        image = ImageOps.exif_transpose(image)
+    widths = [
+        width for width in IMAGE_RENDITION_WIDTHS if width < image.width
+    ] or [image.width]
+
+    renditions = {extension: [] for extension in RENDITION_FORMATS}
+    for width in widths:
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for extension in RENDITION_FORMATS:
+            name = rendition_name(post.image.name, width, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            name = storage.save(name, ContentFile(_encode(resized, extension)))
+            renditions[extension].append((width, name))
+
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        image_renditions=renditions
+    )
+    if not updated:
+        delete_files(rendition_files(renditions))
+        return {}
+    invalidate_post_pages(post.pk, {post.author_id}, {post.category_id})
+    return renditions
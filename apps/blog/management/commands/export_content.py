@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.transfer import export_content, format_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Export users, categories, locations, posts and comments'
+        ' as newline-delimited JSON from a consistent snapshot.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'path', nargs='?', default='-', help='Output file, - for stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Count of objects fetched from the database at once.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options['path'] == '-':
+            counts = export_content(sys.stdout, options['chunk_size'])
+            self.stderr.write(f'Exported {format_counts(counts)}.')
+            return
+        with open(options['path'], 'w', encoding='utf-8') as stream:
+            counts = export_content(stream, options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Exported {format_counts(counts)}.')
+        )
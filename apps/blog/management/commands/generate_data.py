@@ -0,0 +1,58 @@
+from django.core.management import call_command
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from blog import feeds
+from blog.fake_data import generate
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic users, posts and comments'
+        ' for benchmarks. Defaults match production scale.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument(
+            '--comments',
+            type=int,
+            default=10_000_000,
+            help='Approximate count of comments.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Same seed generates the same content.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Count of posts inserted in one transaction.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        try:
+            created = generate(
+                users=options['users'],
+                posts=options['posts'],
+                comments=options['comments'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+                log=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(exc) from exc
+        call_command('release_posts', stdout=self.stdout)
+        if feeds.is_enabled():
+            call_command('rebuild_feeds', stdout=self.stdout)
+        summary = ', '.join(
+            f'{count} {name}' for name, count in created.items()
+        )
+        self.stdout.write(self.style.SUCCESS(f'Created {summary}.'))
@@ -0,0 +1,53 @@
+import sys
+from typing import IO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.core.serializers.base import DeserializationError
+
+from blog import feeds
+from blog.transfer import format_counts, import_content
+
+
+class Command(BaseCommand):
+    help = (
+        'Import content exported by export_content. Objects which are'
+        ' already in the database are skipped, so interrupted import'
+        ' is resumed by running it again.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('path', help='Input file, - for stdin.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Count of objects saved in one transaction.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        try:
+            if options['path'] == '-':
+                counts = self.load(sys.stdin, options['batch_size'])
+            else:
+                with open(options['path'], encoding='utf-8') as stream:
+                    counts = self.load(stream, options['batch_size'])
+        except (OSError, ValueError, DeserializationError) as exc:
+            raise CommandError(exc) from exc
+        # Signals are not sent, so cached pages are not invalidated,
+        # scheduled posts are not queued and feeds are not updated.
+        cache.clear()
+        call_command('release_posts', stdout=self.stdout)
+        if feeds.is_enabled():
+            call_command('rebuild_feeds', stdout=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(f'Imported {format_counts(counts)}.')
+        )
+
+    def load(self, stream: IO[str], batch_size: int) -> dict[str, int]:
+        return import_content(stream, batch_size, log=self.stdout.write)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog.feeds import rebuild_feeds
+
+
+class Command(BaseCommand):
+    help = (
+        'Recreate materialized feeds. Run it after enabling'
+        ' BLOG_FEED_ENTRIES, loading fixtures or importing content.'
+    )
+
+    def handle(self, *args, **options) -> None:
+        created = rebuild_feeds()
+        self.stdout.write(
+            self.style.SUCCESS(f'Created {created} feed entries.')
+        )
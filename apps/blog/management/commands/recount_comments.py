@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalculate stored comment counters of all posts.'
+        ' Run it after loading fixtures or bulk editing comments.'
+    )
+
+    def handle(self, *args, **options) -> None:
+        updated = Post.objects.update_comment_counts()
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} posts.'))
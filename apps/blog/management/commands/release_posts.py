@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.scheduling import release_due_posts
+from blog.tasks import schedule_releases
+
+
+class Command(BaseCommand):
+    help = (
+        'Release posts whose pub_date has come and queue release of'
+        ' scheduled posts. Run it after migrating, loading fixtures or'
+        ' importing content, and keep run_worker running to release'
+        ' posts in time.'
+    )
+
+    def handle(self, *args, **options) -> None:
+        released = release_due_posts()
+        scheduled = schedule_releases(Post.objects.all())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Released {released} posts, queued {scheduled} releases.'
+            )
+        )
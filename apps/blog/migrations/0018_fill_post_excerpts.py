@@ -0,0 +1,43 @@
+from django.db import migrations, transaction
+from django.utils.text import Truncator
+
+from blog.constants import EXCERPT_WORDS
+
+BATCH_SIZE = 1000
+
+
+def fill_excerpts(apps, schema_editor):
+    """Fill excerpts by batches of posts, each in its own transaction.
+
+    Interrupted migration continues with posts still without excerpt.
+    """
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias)
+    last_pk = 0
+    while True:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            batch = list(
+                posts.filter(pk__gt=last_pk, excerpt='')
+                .order_by('pk')
+                .only('text')[:BATCH_SIZE]
+            )
+            if not batch:
+                return
+            for post in batch:
+                post.excerpt = Truncator(post.text).words(
+                    EXCERPT_WORDS, truncate=' …'
+                )
+            posts.bulk_update(batch, ('excerpt',))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('blog', '0017_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
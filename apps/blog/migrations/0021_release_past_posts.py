@@ -0,0 +1,65 @@
+from django.db import migrations, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+# Name of `blog.tasks.release_scheduled_posts` in the task queue.
+RELEASE_TASK = 'blog.tasks.release_scheduled_posts'
+
+
+def release_past_posts(apps, schema_editor):
+    """Mark posts with past pub_date as released by batches.
+
+    Release of the remaining posts is queued at their pub_date, as
+    `release_posts` command does, and `run_worker` executes it.
+    """
+    Post = apps.get_model('blog', 'Post')
+    Task = apps.get_model('core', 'Task')
+    alias = schema_editor.connection.alias
+    posts = Post.objects.using(alias)
+    now = timezone.now()
+    last_pk = 0
+    while True:
+        with transaction.atomic(using=alias):
+            batch = list(
+                posts.filter(pk__gt=last_pk, pub_date__lte=now)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            posts.filter(pk__in=batch).update(is_released=True)
+        last_pk = batch[-1]
+
+    pub_dates = (
+        posts.filter(pub_date__gt=now)
+        .order_by('pub_date')
+        .values_list('pub_date', flat=True)
+        .distinct()
+    )
+    Task.objects.using(alias).bulk_create(
+        (
+            Task(
+                name=RELEASE_TASK,
+                args=[],
+                kwargs={},
+                max_attempts=3,
+                run_after=pub_date,
+            )
+            for pub_date in pub_dates.iterator()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('blog', '0020_post_is_released'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(release_past_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_release_past_posts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True), ('is_released', False)), fields=['pub_date', 'category', 'is_published', 'is_released'], name='post_scheduled_idx'),
+        ),
+    ]
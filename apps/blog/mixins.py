@@ -1,14 +1,50 @@
+from typing import Any
+
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.core.cache import cache
+from django.db.models import Model, QuerySet
+from django.http import Http404, HttpRequest, HttpResponse
 from django.http.response import HttpResponseRedirect
 from django.shortcuts import redirect
+from django.template.response import TemplateResponse
 from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+
+from blog.cache import (
+    aget_scheduled_timeout,
+    aget_versioned_key,
+    get_next_pub_dates,
+    get_page_cache_key,
+    get_scheduled_timeout,
+    get_versioned_key,
+)
+from blog.constants import PAGE_CACHE_TIMEOUT
+from blog.models import FEED_CURSOR_KEYS, FeedEntry
+from blog.paginators import CURSOR_KEYS, CursorPaginator, FeedPaginator
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
-    """Mixin which restricts non-author users from accessing edit page."""
+    """Mixin which restricts non-author users from accessing edit page.
+
+    Object is fetched once per request and shared by the permission check
+    and the view. Authorship is checked by `author_id`, without loading
+    the author.
+    """
+
+    @cached_property
+    def _object(self) -> Model:
+        return super().get_object()
+
+    def get_object(self, queryset: QuerySet | None = None) -> Model:
+        if queryset is not None:
+            return super().get_object(queryset)
+        return self._object
 
     def test_func(self) -> bool:
-        return self.get_object().author == self.request.user
+        user = self.request.user
+        return user.is_authenticated and self._object.author_id == user.pk
 
     def handle_no_permission(self) -> HttpResponseRedirect:
         return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
@@ -23,8 +59,195 @@ class RedirectToPostPageMixin:
 
 
 class RedirectToProfileMixin:
+    """Redirect to profile of the current user, who owns the object."""
+
     def get_success_url(self) -> str:
         return reverse(
             'blog:profile',
-            kwargs={'username': self.object.author.username},  # type: ignore
+            kwargs={'username': self.request.user.username},  # type: ignore
+        )
+
+
+class CursorPaginationMixin:
+    """Paginate list view by `?after=`/`?before=` cursors.
+
+    Enabled with `BLOG_CURSOR_PAGINATION` setting, otherwise list view
+    falls back to regular page-number pagination. Queryset fields
+    compared with cursors are named by `cursor_keys`.
+    """
+
+    cursor_keys = CURSOR_KEYS
+
+    @property
+    def cursor_pagination(self) -> bool:
+        return settings.BLOG_CURSOR_PAGINATION
+
+    def paginate_queryset(self, queryset: QuerySet, page_size: int) -> tuple:
+        if not self.cursor_pagination:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(queryset, page_size, self.cursor_keys)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),  # type: ignore
+                before=self.request.GET.get('before'),  # type: ignore
+            )
+        except ValueError as exc:
+            raise Http404('Неверный курсор страницы.') from exc
+        return (None, page, page.object_list, page.has_other_pages())
+
+
+class PageCacheMixin:
+    """Cache of page HTML for anonymous users, shared by sync and async views.
+
+    Views list version scopes their page depends on in
+    `get_page_cache_scopes`, writes bump these scopes to purge the page.
+    Release of scheduled posts bumps them too, but without a shared cache
+    the bumps never reach other processes, so cache timeout is also
+    capped by pub_date of the next post from `get_scheduled_posts`.
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+    # Query parameters the page depends on, others don't split the cache.
+    # Set by each view, feeds get theirs from FeedPaginationMixin.
+    page_cache_params: tuple[str, ...]
+
+    def get_page_cache_scopes(self) -> list[tuple[str, int]] | None:
+        """Return version scopes of the page or None to skip caching."""
+        raise NotImplementedError
+
+    def get_scheduled_posts(self) -> QuerySet | None:
+        """Return scheduled posts which will appear on the page."""
+        return None
+
+    def get_page_cache_name(self) -> str:
+        """Return name of the page, unique for each distinct HTML."""
+        request = self.request  # type: ignore
+        params = [
+            (name, request.GET[name])
+            for name in self.page_cache_params
+            if name in request.GET
+        ]
+        return f'{request.path}?{urlencode(params)}'
+
+    @cached_property
+    def next_pub_dates(self) -> QuerySet | None:
+        scheduled_posts = self.get_scheduled_posts()
+        if scheduled_posts is None:
+            return None
+        return get_next_pub_dates(scheduled_posts)
+
+    def get_page_cache_timeout(self) -> int:
+        if self.next_pub_dates is None:
+            return self.page_cache_timeout
+        return get_scheduled_timeout(
+            self.next_pub_dates, self.page_cache_timeout
+        )
+
+    async def aget_page_cache_timeout(self) -> int:
+        if self.next_pub_dates is None:
+            return self.page_cache_timeout
+        return await aget_scheduled_timeout(
+            self.next_pub_dates, self.page_cache_timeout
+        )
+
+
+class AnonymousPageCacheMixin(PageCacheMixin):
+    """Serve cached HTML of the page to anonymous users."""
+
+    @cached_property
+    def page_cache_scopes(self) -> list[tuple[str, int]] | None:
+        return self.get_page_cache_scopes()
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        if self.page_cache_scopes is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        key = get_page_cache_key(
+            self.get_page_cache_name(), self.page_cache_scopes
+        )
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+
+        def store(response: HttpResponse) -> None:
+            timeout = self.get_page_cache_timeout()
+            if timeout:
+                cache.set(key, response.content, timeout)
+
+        if isinstance(response, TemplateResponse):
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+
+
+class FeedPaginationMixin:
+    """Paginate feed with `FeedPaginator`, caching post count of the feed.
+
+    Count is cached under the same version scopes as the whole page in
+    `PageCacheMixin`, so writes to the feed invalidate it.
+    """
+
+    paginator_class = FeedPaginator
+    page_cache_params = ('page', 'after', 'before')
+    post_ids: QuerySet | None = None
+
+    def get_count_cache_name(self) -> str:
+        """Return name of the feed, unique for each distinct post count."""
+        return self.request.path  # type: ignore
+
+    def get_paginator_kwargs(self) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {'post_ids': self.post_ids}
+        if self.page_cache_scopes is not None:  # type: ignore
+            kwargs['count_cache_key'] = get_versioned_key(
+                'count',
+                self.get_count_cache_name(),
+                self.page_cache_scopes,  # type: ignore
+            )
+            kwargs['next_pub_dates'] = self.next_pub_dates  # type: ignore
+        return kwargs
+
+    async def aget_paginator_kwargs(self) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {'post_ids': self.post_ids}
+        if self.page_cache_scopes is not None:  # type: ignore
+            kwargs['count_cache_key'] = await aget_versioned_key(
+                'count',
+                self.get_count_cache_name(),
+                self.page_cache_scopes,  # type: ignore
+            )
+            kwargs['next_pub_dates'] = self.next_pub_dates  # type: ignore
+        return kwargs
+
+    def get_paginator(
+        self, queryset: QuerySet, per_page: int, **kwargs
+    ) -> FeedPaginator:
+        kwargs.update(self.get_paginator_kwargs())
+        return super().get_paginator(queryset, per_page, **kwargs)
+
+
+class MaterializedFeedMixin:
+    """Read posts of the feed from `FeedEntry` table.
+
+    Cursor pages join entries and compare cursors with their columns.
+    Page-number pages take ids of the page from entries first, so
+    `FeedPaginationMixin` neither counts nor skips posts.
+    """
+
+    def read_feed(self, posts: QuerySet, scope: str) -> QuerySet:
+        if self.cursor_pagination:  # type: ignore
+            self.cursor_keys = FEED_CURSOR_KEYS
+            return posts.from_feed(scope)
+        self.post_ids = (
+            FeedEntry.objects.filter(scope=scope)
+            .order_by('-pub_date', '-post_id')
+            .values('post_id')
         )
+        return posts.order_by('-pub_date', '-pk')
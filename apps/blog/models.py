@@ -1,8 +1,17 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.base_user import AbstractBaseUser
-from django.db import models
-from django.utils import timezone
-
+from django.db import connections, models
+from django.db.models.functions import Coalesce
+from django.utils.text import Truncator
+
+from blog.constants import EXCERPT_WORDS
+from blog.search import (
+    FTS_TABLE,
+    MATCH_WHERE_SQL,
+    RANK_SQL,
+    supports_search,
+    to_fts_query,
+)
 from core.models import (
     ContainsCreateDate,
     Publishable,
@@ -10,6 +19,26 @@ from core.models import (
 
 User = get_user_model()
 
+# Columns of posts and their related objects shown on feed cards.
+CARD_FIELDS = (
+    'title',
+    'excerpt',
+    'pub_date',
+    'is_published',
+    'image',
+    'image_renditions',
+    'comment_count',
+    'author__username',
+    'category__title',
+    'category__slug',
+    'category__is_published',
+    'location__name',
+    'location__is_published',
+)
+
+# Annotations of `PostQuerySet.from_feed()` to paginate it by cursor.
+FEED_CURSOR_KEYS = ('feed_pub_date', 'feed_post_id')
+
 
 class PostQuerySet(models.QuerySet):
     """Custom query set for post model."""
@@ -21,25 +50,116 @@ class PostQuerySet(models.QuerySet):
             published_posts |= self.filter(author=user)
         return published_posts
 
+    def get_author_posts(
+        self, author: AbstractBaseUser, user: AbstractBaseUser
+    ) -> 'PostQuerySet':
+        """Return posts of the author available for user.
+
+        Same posts as `get_all_for_user(user).filter(author=author)`, but
+        without OR between visibility check and authorship, so the query
+        stays a single range over (author_id, pub_date) index.
+        """
+        if user.is_authenticated and user.pk == author.pk:
+            return self.filter(author=author)
+        return self.get_published().filter(author=author)
+
     def get_published(self) -> 'PostQuerySet':
         """Fetch posts which are published.
 
         Published posts are not either:
         1. Have is_published flag set to False.
         2. Belong to category with is_published flag set to False.
-        3. Have pub_date greater than now.
+        3. Have pub_date which has not come yet, i.e. is_released flag
+           set to False.
+
+        The query has no current time in it, so it is the same for
+        every request.
         """
         return self.filter(
             is_published=True,
             category__is_published=True,
-            pub_date__lte=timezone.now(),
+            is_released=True,
+        )
+
+    def get_scheduled(self) -> 'PostQuerySet':
+        """Fetch posts which will be published when pub_date comes."""
+        return self.filter(
+            is_published=True,
+            category__is_published=True,
+            is_released=False,
         )
 
+    def search(self, query: str) -> 'PostQuerySet':
+        """Find posts containing all words of the query, best match first.
+
+        Uses FTS5 index on SQLite and ranks posts by BM25, on other
+        databases falls back to unranked substring search.
+        """
+        fts_query = to_fts_query(query)
+        if not fts_query:
+            return self.none()
+        if not supports_search(connections[self.db]):
+            return self.filter(
+                models.Q(title__icontains=query)
+                | models.Q(text__icontains=query)
+            )
+        return self.extra(
+            select={'rank': RANK_SQL},
+            tables=(FTS_TABLE,),
+            where=MATCH_WHERE_SQL,
+            params=(fts_query,),
+        ).order_by('rank', '-pub_date')
+
     def select_all_related(self) -> 'PostQuerySet':
         """Select all foreign keys for the posts."""
-        return self.select_related(
-            'author', 'category', 'location'
-        ).prefetch_related('comments')
+        return self.select_related('author', 'category', 'location')
+
+    def for_cards(self) -> 'PostQuerySet':
+        """Select posts with only the columns shown on feed cards.
+
+        Stored excerpt is read instead of text. Password hashes of
+        authors and descriptions of categories are not read either.
+        """
+        return self.select_all_related().only(*CARD_FIELDS)
+
+    def for_detail(self) -> 'PostQuerySet':
+        """Select posts with only the columns shown on the post page."""
+        return self.select_all_related().only(*CARD_FIELDS, 'text')
+
+    def from_feed(self, scope: str) -> 'PostQuerySet':
+        """Select posts listed in the materialized feed, newest first.
+
+        Posts are ordered by columns of `FeedEntry`, annotated as
+        `FEED_CURSOR_KEYS`, so the feed is read by a range of its index.
+        """
+        return (
+            self.filter(feed_entries__scope=scope)
+            .annotate(
+                feed_pub_date=models.F('feed_entries__pub_date'),
+                feed_post_id=models.F('feed_entries__post_id'),
+            )
+            .order_by('-feed_pub_date', '-feed_post_id')
+        )
+
+    def update_comment_counts(self) -> int:
+        """Recalculate stored comment counters from comments table.
+
+        Returns:
+            Count of updated posts.
+        """
+        published_comments = (
+            Comment.objects.filter(
+                post=models.OuterRef('pk'),
+                is_published=True,
+            )
+            .order_by()
+            .values('post')
+            .annotate(count=models.Count('pk'))
+            .values('count')
+        )
+        return self.update(
+            comment_count=Coalesce(models.Subquery(published_comments), 0)
+        )
 
 
 class Category(Publishable, ContainsCreateDate):
@@ -93,6 +213,12 @@ class Post(Publishable, ContainsCreateDate):
     text = models.TextField(
         verbose_name='Текст',
     )
+    excerpt = models.TextField(
+        'Анонс',
+        blank=True,
+        editable=False,
+        help_text='Начало текста для ленты, обновляется при сохранении.',
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text=(
@@ -100,6 +226,12 @@ class Post(Publishable, ContainsCreateDate):
             ' — можно делать отложенные публикации.'
         ),
     )
+    is_released = models.BooleanField(
+        'Дата публикации наступила',
+        default=False,
+        editable=False,
+        help_text='Обновляется автоматически в дату публикации.',
+    )
 
     author = models.ForeignKey(
         User,
@@ -128,11 +260,20 @@ class Post(Publishable, ContainsCreateDate):
         blank=True,
         upload_to='post_images',
     )
+    image_renditions = models.JSONField(
+        'Уменьшенные копии фото',
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Пары (ширина, файл) для каждого формата.',
+    )
 
-    @property
-    def comment_count(self) -> int:
-        """Count of comments under this post."""
-        return self.comments.count()
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+        help_text='Обновляется автоматически при изменении комментариев.',
+    )
 
     objects = PostQuerySet.as_manager()
 
@@ -140,10 +281,96 @@ class Post(Publishable, ContainsCreateDate):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            # Main feed: published posts from newest to oldest. SQLite
+            # reads columns of the condition from post rows, trailing
+            # columns let feeds be counted from the index alone.
+            models.Index(
+                fields=(
+                    '-pub_date',
+                    'category',
+                    'is_published',
+                    'is_released',
+                ),
+                condition=models.Q(is_published=True, is_released=True),
+                name='post_published_feed_idx',
+            ),
+            # Category feed.
+            models.Index(
+                fields=(
+                    'category',
+                    '-pub_date',
+                    'is_published',
+                    'is_released',
+                ),
+                condition=models.Q(is_published=True, is_released=True),
+                name='post_category_feed_idx',
+            ),
+            # Author profile, contains unpublished posts for their owner.
+            # Trailing columns let visitors' feed be filtered and counted
+            # without reading post rows.
+            models.Index(
+                fields=(
+                    'author',
+                    '-pub_date',
+                    'is_published',
+                    'is_released',
+                    'category',
+                ),
+                name='post_author_feed_idx',
+            ),
+            # Scheduled posts, whose next pub_date caps cache timeout of
+            # feeds.
+            models.Index(
+                fields=(
+                    'pub_date',
+                    'category',
+                    'is_published',
+                    'is_released',
+                ),
+                condition=models.Q(is_published=True, is_released=False),
+                name='post_scheduled_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return f'{self.pub_date} - {self.title}'
 
+    @staticmethod
+    def make_excerpt(text: str) -> str:
+        """Return the first words of text as shown on feed cards."""
+        return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+class FeedEntry(models.Model):
+    """Visible post of a category or author feed.
+
+    Denormalized copy of `PostQuerySet.get_published()` per feed, kept
+    by `blog.feeds` when `BLOG_FEED_ENTRIES` setting is enabled.
+    """
+
+    scope = models.CharField('Лента', max_length=64)
+    pub_date = models.DateTimeField('Дата и время публикации')
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Публикация',
+    )
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Записи лент'
+        indexes = (
+            models.Index(
+                fields=('scope', '-pub_date', '-post'),
+                name='feed_entry_range_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.scope}: {self.post_id}'
+
 
 class Comment(Publishable, ContainsCreateDate):
     """A single comment under some post."""
@@ -167,6 +394,14 @@ class Comment(Publishable, ContainsCreateDate):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            # Comments under the post, from oldest to newest.
+            models.Index(
+                fields=('post', 'created_at'),
+                condition=models.Q(is_published=True),
+                name='comment_post_feed_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return f'Комментарий {self.author} к посту "{self.post.title}"'
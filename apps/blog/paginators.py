@@ -0,0 +1,300 @@
+import base64
+import binascii
+from collections.abc import Iterator
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Model, Q, QuerySet
+from django.utils.functional import cached_property
+
+from blog.cache import aget_scheduled_timeout, get_scheduled_timeout
+from blog.constants import PAGES_AROUND_CURRENT, POST_COUNT_CACHE_TIMEOUT
+
+# Largest id SQLite and 64-bit integer columns can compare with.
+MAX_POST_ID = 2**63 - 1
+
+# Fields of the feed queryset holding pub_date and id of posts.
+CURSOR_KEYS = ('pub_date', 'id')
+
+
+def encode_cursor(post: Model) -> str:
+    """Encode post position in the feed as an opaque url-safe token."""
+    raw = f'{post.pub_date.isoformat()}|{post.id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> tuple[datetime, int]:
+    """Decode token created by `encode_cursor`.
+
+    Raises:
+        ValueError: If token is malformed, its date is naive or its id
+            is out of range of post ids.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        pub_date, post_id = raw.decode().split('|')
+        pub_date, post_id = datetime.fromisoformat(pub_date), int(post_id)
+    except (TypeError, UnicodeDecodeError, binascii.Error) as exc:
+        raise ValueError(f'Invalid cursor: {token}') from exc
+    if pub_date.tzinfo is None or not 0 < post_id <= MAX_POST_ID:
+        raise ValueError(f'Invalid cursor: {token}')
+    return pub_date, post_id
+
+
+class CursorPage:
+    """Page of posts located by cursor instead of page number."""
+
+    is_cursor = True
+
+    def __init__(
+        self,
+        object_list: list,
+        has_next: bool,
+        has_previous: bool,
+    ) -> None:
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self) -> Iterator[Model]:
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index: int) -> Model:
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self) -> bool:
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self) -> str | None:
+        if not self.has_next():
+            return None
+        return encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self) -> str | None:
+        if not self.has_previous():
+            return None
+        return encode_cursor(self.object_list[0])
+
+
+class CursorPaginator:
+    """Keyset paginator over posts ordered by (pub_date, id) descending.
+
+    Unlike the default paginator it never runs COUNT(*) and never uses
+    OFFSET, so fetching any page costs the same single indexed query.
+    Queryset may provide pub_date and id under other names in `keys`,
+    e.g. as columns of a joined table whose index covers the ordering.
+    """
+
+    def __init__(
+        self,
+        queryset: QuerySet,
+        per_page: int,
+        keys: tuple[str, str] = CURSOR_KEYS,
+    ) -> None:
+        self.queryset = queryset
+        self.per_page = per_page
+        self.keys = keys
+
+    def page(
+        self,
+        after: str | None = None,
+        before: str | None = None,
+    ) -> CursorPage:
+        """Return page following `after` or preceding `before` cursor.
+
+        Raises:
+            ValueError: If cursor is malformed.
+        """
+        return self._make_page(
+            list(self._get_rows(after, before)), after, before
+        )
+
+    async def apage(
+        self,
+        after: str | None = None,
+        before: str | None = None,
+    ) -> CursorPage:
+        """Async version of `page`."""
+        rows = [post async for post in self._get_rows(after, before)]
+        return self._make_page(rows, after, before)
+
+    def _get_rows(self, after: str | None, before: str | None) -> QuerySet:
+        """Query one post more than page size to tell if there are more."""
+        limit = self.per_page + 1
+        date_key, id_key = self.keys
+
+        if before:
+            pub_date, post_id = decode_cursor(before)
+            return self.queryset.filter(
+                Q(**{f'{date_key}__gt': pub_date})
+                | Q(**{date_key: pub_date, f'{id_key}__gt': post_id})
+            ).order_by(date_key, id_key)[:limit]
+
+        queryset = self.queryset.order_by(f'-{date_key}', f'-{id_key}')
+        if after:
+            pub_date, post_id = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(**{f'{date_key}__lt': pub_date})
+                | Q(**{date_key: pub_date, f'{id_key}__lt': post_id})
+            )
+        return queryset[:limit]
+
+    def _make_page(
+        self, rows: list, after: str | None, before: str | None
+    ) -> CursorPage:
+        if before:
+            return CursorPage(
+                rows[: self.per_page][::-1],
+                has_next=True,
+                has_previous=len(rows) > self.per_page,
+            )
+        return CursorPage(
+            rows[: self.per_page],
+            has_next=len(rows) > self.per_page,
+            has_previous=bool(after),
+        )
+
+
+class FeedPage(Page):
+    @property
+    def page_window(self) -> list[int | str]:
+        """Page numbers near the current one and at both ends of the feed.
+
+        Skipped ranges are replaced by `Paginator.ELLIPSIS`.
+        """
+        return list(
+            self.paginator.get_elided_page_range(
+                self.number, on_each_side=PAGES_AROUND_CURRENT, on_ends=1
+            )
+        )
+
+
+class FeedPaginator(Paginator):
+    """Paginator which keeps post count of the feed in cache.
+
+    Count is cached under versioned `count_cache_key`, which changes
+    with writes to the feed, until the next scheduled post from
+    `next_pub_dates` is published, so COUNT(*) runs only after them.
+
+    `post_ids` is an optional queryset of ids of the feed posts in feed
+    order, read from an index of another table. Then ids are counted
+    instead of posts, and each page reads posts with the sliced ids
+    from `object_list`, so posts skipped by OFFSET are never joined.
+    `object_list` only has to order posts then.
+    """
+
+    def __init__(
+        self,
+        object_list: QuerySet,
+        per_page: int,
+        count_cache_key: str | None = None,
+        next_pub_dates: QuerySet | None = None,
+        post_ids: QuerySet | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.next_pub_dates = next_pub_dates
+        self.post_ids = post_ids
+
+    def _count_rows(self) -> int:
+        if self.post_ids is None:
+            return super().count
+        return self.post_ids.count()
+
+    @cached_property
+    def count(self) -> int:
+        if self.count_cache_key is None:
+            return self._count_rows()
+
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = self._count_rows()
+            timeout = POST_COUNT_CACHE_TIMEOUT
+            if self.next_pub_dates is not None:
+                timeout = get_scheduled_timeout(self.next_pub_dates, timeout)
+            if timeout:
+                cache.set(self.count_cache_key, count, timeout)
+        return count
+
+    async def acount(self) -> int:
+        """Async version of `count`."""
+        if 'count' in self.__dict__:
+            return self.count
+
+        count = None
+        if self.count_cache_key is not None:
+            count = await cache.aget(self.count_cache_key)
+        if count is None:
+            counted = (
+                self.object_list if self.post_ids is None else self.post_ids
+            )
+            count = await counted.acount()
+            if self.count_cache_key is not None:
+                timeout = POST_COUNT_CACHE_TIMEOUT
+                if self.next_pub_dates is not None:
+                    timeout = await aget_scheduled_timeout(
+                        self.next_pub_dates, timeout
+                    )
+                if timeout:
+                    await cache.aset(self.count_cache_key, count, timeout)
+        self.count = count
+        return count
+
+    def page(self, number: int | str) -> FeedPage:
+        if self.post_ids is None:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        posts = self.object_list.filter(pk__in=self.post_ids[bottom:top])
+        return self._get_page(posts, number, self)
+
+    async def apage(self, number: int) -> FeedPage:
+        """Async version of `page`, posts of the page are fetched."""
+        await self.acount()
+        page = self.page(number)
+        page.object_list = [post async for post in page.object_list]
+        return page
+
+    def _get_page(self, *args, **kwargs) -> FeedPage:
+        return FeedPage(*args, **kwargs)
+
+
+class CommentPaginator(Paginator):
+    """Paginator over published comments of the post.
+
+    Uses comment counter stored in the post instead of COUNT(*).
+    """
+
+    def __init__(self, post: Model, per_page: int, **kwargs) -> None:
+        super().__init__(
+            post.comments.filter(is_published=True).select_related('author'),
+            per_page,
+            **kwargs,
+        )
+        self.post = post
+
+    @cached_property
+    def count(self) -> int:
+        return self.post.comment_count
+
+    async def aget_page(self, number: int | str | None) -> Page:
+        """Async version of `get_page`, comments of the page are fetched."""
+        page = self.get_page(number)
+        page.object_list = [comment async for comment in page.object_list]
+        return page
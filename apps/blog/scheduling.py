@@ -0,0 +1,47 @@
+"""Release of scheduled posts.
+
+Visibility of posts by date is stored in `Post.is_released` flag instead
+of comparing pub_date with the current time in every query, so feed
+queries and their cached results stay the same between requests.
+Saving a post sets the flag from its pub_date, and for posts scheduled
+to the future `release_scheduled_posts` task is queued at their
+pub_date. The task sets the flag and bumps versions of cached pages
+listing the posts. Pages and counts are also cached no longer than
+until the next pub_date, as bumps made by the worker reach other
+processes only through a shared cache. Bulk writes send no signals,
+`release_posts` command catches up after them.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from blog import feeds
+from blog.cache import invalidate_post_pages
+from blog.models import Post
+
+
+def release_due_posts(batch_size: int = 1000) -> int:
+    """Release posts whose pub_date has come, by batches.
+
+    Returns:
+        Count of released posts.
+    """
+    now = timezone.now()
+    due = Post.objects.filter(is_released=False, pub_date__lte=now)
+    released = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                due.order_by('pk').values_list(
+                    'pk', 'author_id', 'category_id'
+                )[:batch_size]
+            )
+            if not batch:
+                return released
+            post_ids = [post_id for post_id, *_ in batch]
+            due.filter(pk__in=post_ids).update(is_released=True)
+            if feeds.is_enabled():
+                feeds.sync_feed_entries(Post.objects.filter(pk__in=post_ids))
+        for post_id, author_id, category_id in batch:
+            invalidate_post_pages(post_id, {author_id}, {category_id})
+        released += len(batch)
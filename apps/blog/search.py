@@ -0,0 +1,110 @@
+"""Full-text search over posts backed by SQLite FTS5.
+
+`blog_post_fts` is an external content FTS5 table over title and text of
+`blog_post`, kept in sync by triggers. SQLite drops triggers whenever
+Django rebuilds `blog_post` during migrations, so they are recreated
+after every `migrate` by `install_search_index`.
+"""
+
+import re
+
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+FTS_TABLE = 'blog_post_fts'
+TRIGGERS = ('insert', 'delete', 'update')
+
+CREATE_INDEX_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, text,
+        content='blog_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON blog_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON blog_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF title, text ON blog_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+)
+
+DROP_INDEX_SQL = (
+    *(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{event}' for event in TRIGGERS),
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+# Joins FTS table to posts found by FTS query, the only parameter.
+MATCH_WHERE_SQL = (
+    f'{FTS_TABLE}.rowid = blog_post.id',
+    f'{FTS_TABLE} MATCH %s',
+)
+
+# BM25 score of the post, lower is better. Title weighs more than text.
+# Computed in the same scan as the match: a correlated subquery would
+# rerun the whole FTS query for every found post.
+RANK_SQL = f'bm25({FTS_TABLE}, 5.0, 1.0)'
+
+
+def supports_search(connection: BaseDatabaseWrapper) -> bool:
+    return connection.vendor == 'sqlite'
+
+
+def install_search_index(connection: BaseDatabaseWrapper) -> None:
+    """Create FTS table and its triggers if any of them is missing.
+
+    Index is rebuilt from posts table in that case, as posts could have
+    been changed while triggers were missing.
+    """
+    if not supports_search(connection):
+        return
+    with connection.cursor() as cursor:
+        names = (FTS_TABLE, *(f'{FTS_TABLE}_{event}' for event in TRIGGERS))
+        cursor.execute(
+            'SELECT COUNT(*) FROM sqlite_master'
+            ' WHERE name IN (%s, %s, %s, %s)',
+            names,
+        )
+        if cursor.fetchone()[0] == len(CREATE_INDEX_SQL):
+            return
+        for sql in CREATE_INDEX_SQL:
+            cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def drop_search_index(connection: BaseDatabaseWrapper) -> None:
+    if not supports_search(connection):
+        return
+    with connection.cursor() as cursor:
+        for sql in DROP_INDEX_SQL:
+            cursor.execute(sql)
+
+
+def to_fts_query(query: str) -> str:
+    """Convert user input into FTS5 query.
+
+    Every word is quoted, so FTS5 syntax in the input is not interpreted,
+    and matched as prefix. All words must be present in the post.
+    """
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
@@ -0,0 +1,306 @@
+from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import F, Model
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog import feeds
+from blog.cache import bump_version, invalidate_post_pages
+from blog.images import rendition_files
+from blog.models import Category, Comment, FeedEntry, Location, Post
+from blog.search import install_search_index
+from blog.tasks import (
+    create_post_renditions,
+    delete_image_files,
+    notify_post_author,
+    release_scheduled_posts,
+)
+
+User = get_user_model()
+
+
+def _shift_comment_count(post_id: int | None, delta: int) -> None:
+    if post_id is not None:
+        Post.objects.filter(pk=post_id).update(
+            comment_count=F('comment_count') + delta
+        )
+        post = Post.objects.filter(pk=post_id).values(
+            'author_id', 'category_id'
+        )
+        for fields in post:
+            invalidate_post_pages(
+                post_id, {fields['author_id']}, {fields['category_id']}
+            )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_counted_post(
+    sender: type[Comment], instance: Comment, **kwargs
+) -> None:
+    """Remember which post counter already includes this comment."""
+    instance._counted_post_id = None
+    if instance.pk is not None and not kwargs['raw']:
+        instance._counted_post_id = (
+            Comment.objects.filter(pk=instance.pk, is_published=True)
+            .values_list('post_id', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def update_count_on_save(
+    sender: type[Comment], instance: Comment, **kwargs
+) -> None:
+    """Keep post comment counter in sync with published comments.
+
+    Fixture loading is skipped, run `recount_comments` command afterwards.
+    """
+    if kwargs['raw']:
+        return
+    counted_post_id = instance._counted_post_id
+    new_post_id = instance.post_id if instance.is_published else None
+    if counted_post_id != new_post_id:
+        _shift_comment_count(counted_post_id, -1)
+        _shift_comment_count(new_post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_count_on_delete(
+    sender: type[Comment], instance: Comment, **kwargs
+) -> None:
+    if instance.is_published:
+        _shift_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_comments(
+    sender: type[Comment], instance: Comment, **kwargs
+) -> None:
+    """Drop cached post page showing the comment."""
+    bump_version('post', instance.post_id)
+
+
+@receiver(pre_save, sender=Post)
+def remember_saved_post(sender: type[Post], instance: Post, **kwargs) -> None:
+    """Remember category and author feeds which may still contain the post.
+
+    Renditions of replaced image are dropped, their files are deleted
+    after the save.
+    """
+    instance._saved_category_id = None
+    instance._saved_author_id = None
+    instance._stale_renditions = []
+    instance._image_changed = bool(instance.image)
+    if instance.pk is None or kwargs['raw']:
+        return
+    saved = Post.objects.filter(pk=instance.pk).values(
+        'category_id', 'author_id', 'image', 'image_renditions'
+    )
+    for fields in saved:
+        instance._saved_category_id = fields['category_id']
+        instance._saved_author_id = fields['author_id']
+        instance._image_changed = fields['image'] != instance.image.name
+        if instance._image_changed:
+            instance._stale_renditions = rendition_files(
+                fields['image_renditions']
+            )
+    if instance._image_changed:
+        instance.image_renditions = {}
+
+
+@receiver(pre_save, sender=Post)
+def fill_excerpt(sender: type[Post], instance: Post, **kwargs) -> None:
+    """Store the beginning of text shown on feed cards.
+
+    Objects created with `bulk_create` bypass it and need the excerpt
+    set explicitly.
+    """
+    instance.excerpt = Post.make_excerpt(instance.text)
+
+
+@receiver(pre_save, sender=Post)
+def fill_release_flag(sender: type[Post], instance: Post, **kwargs) -> None:
+    """Release the post if its pub_date has come.
+
+    Objects created with `bulk_create` bypass it and need the flag set
+    explicitly or by `release_posts` command.
+    """
+    instance.is_released = instance.pub_date <= timezone.now()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender: type[Post], instance: Post, **kwargs) -> None:
+    """Drop cached card of the post and pages listing it."""
+    invalidate_post_pages(
+        instance.pk,
+        {instance.author_id, getattr(instance, '_saved_author_id', None)},
+        {instance.category_id, getattr(instance, '_saved_category_id', None)},
+    )
+
+
+@receiver(post_save, sender=Post)
+def process_post_image(sender: type[Post], instance: Post, **kwargs) -> None:
+    """Queue creation of downscaled copies of new image."""
+    if instance.image and getattr(instance, '_image_changed', False):
+        create_post_renditions.delay(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def delete_stale_renditions(
+    sender: type[Post], instance: Post, **kwargs
+) -> None:
+    """Queue deletion of renditions of the replaced image."""
+    stale_renditions = getattr(instance, '_stale_renditions', [])
+    if stale_renditions:
+        delete_image_files.delay(stale_renditions)
+
+
+@receiver(post_delete, sender=Post)
+def delete_renditions(sender: type[Post], instance: Post, **kwargs) -> None:
+    """Queue deletion of renditions of the deleted post."""
+    files = rendition_files(instance.image_renditions)
+    if files:
+        delete_image_files.delay(files)
+
+
+@receiver(post_save, sender=Post)
+def update_post_feeds(sender: type[Post], instance: Post, **kwargs) -> None:
+    """Update materialized feeds listing the post.
+
+    Fixture loading is skipped, run `rebuild_feeds` command afterwards.
+    """
+    if feeds.is_enabled() and not kwargs['raw']:
+        feeds.sync_feed_entries(Post.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Post)
+def schedule_release(sender: type[Post], instance: Post, **kwargs) -> None:
+    """Queue release of the post scheduled to the future.
+
+    Fixture loading is skipped, run `release_posts` command afterwards.
+    """
+    if not instance.is_released and not kwargs['raw']:
+        release_scheduled_posts.delay(run_after=instance.pub_date, unique=True)
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_visibility(
+    sender: type[Category], instance: Category, **kwargs
+) -> None:
+    """Remember saved visibility of the category to update its feeds."""
+    instance._was_published = None
+    if feeds.is_enabled() and instance.pk is not None and not kwargs['raw']:
+        instance._was_published = (
+            Category.objects.filter(pk=instance.pk)
+            .values_list('is_published', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Category)
+def update_category_feeds(
+    sender: type[Category], instance: Category, **kwargs
+) -> None:
+    """Add or remove posts of shown or hidden category in feeds."""
+    if instance._was_published in (None, instance.is_published):
+        return
+    feeds.sync_feed_entries(Post.objects.filter(category=instance))
+
+
+@receiver(post_delete, sender=Category)
+def remove_uncategorized_posts(
+    sender: type[Category], instance: Category, **kwargs
+) -> None:
+    """Drop feed entries of posts left without category."""
+    if feeds.is_enabled():
+        FeedEntry.objects.filter(post__category=None).delete()
+
+
+@receiver(post_save, sender=Comment)
+def notify_about_comment(
+    sender: type[Comment], instance: Comment, created: bool, **kwargs
+) -> None:
+    if created and not kwargs['raw']:
+        notify_post_author.delay(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_cached_fragments(
+    sender: type[Model], instance: Model, **kwargs
+) -> None:
+    """Bump version of changed object to drop fragments rendered with it.
+
+    Categories and locations are shown on most of the pages and rarely
+    change, so all cached pages are dropped too.
+    """
+    bump_version(sender._meta.model_name, instance.pk)
+    bump_version('pages', None)
+
+
+@receiver(pre_save, sender=User)
+def remember_saved_username(
+    sender: type[Model], instance: Model, update_fields: frozenset, **kwargs
+) -> None:
+    """Remember saved username of the user to tell if it changes."""
+    instance._saved_username = instance.username
+    if instance.pk is None or kwargs['raw']:
+        return
+    if update_fields is None or 'username' in update_fields:
+        instance._saved_username = (
+            User.objects.filter(pk=instance.pk)
+            .values_list('username', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_fragments(
+    sender: type[Model],
+    instance: Model,
+    created: bool,
+    update_fields: frozenset,
+    **kwargs,
+) -> None:
+    """Drop cached fragments and pages showing the user.
+
+    Username is shown on cards of every feed, so its change drops all
+    cached pages, other fields are shown only in the profile. New users
+    and saves of `last_login` alone are skipped.
+    """
+    if created or kwargs['raw']:
+        return
+    if update_fields is not None and update_fields <= {'last_login'}:
+        return
+    if instance.username != instance._saved_username:
+        bump_version('user', instance.pk)
+        bump_version('pages', None)
+    else:
+        bump_version('author-feed', instance.pk)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender: AppConfig, using: str, **kwargs) -> None:
+    """Recreate search triggers, dropped when blog_post table is rebuilt."""
+    if sender.name != 'blog':
+        return
+    connection = connections[using]
+    search_migrated = (
+        MigrationRecorder(connection)
+        .migration_qs.filter(app='blog', name='0016_post_search_index')
+        .exists()
+    )
+    if search_migrated:
+        install_search_index(connection)
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db.models import QuerySet
+from django.urls import reverse
+
+from blog.images import create_renditions, delete_files
+from blog.models import Comment, Post
+from blog.scheduling import release_due_posts
+from core.models import Task
+from core.queue import task
+
+
+@task
+def create_post_renditions(post_id: int) -> None:
+    """Create downscaled copies of the post image."""
+    create_renditions(post_id)
+
+
+@task
+def delete_image_files(names: list[str]) -> None:
+    """Delete renditions of replaced or deleted post images."""
+    delete_files(names)
+
+
+@task
+def recount_comments() -> None:
+    """Rebuild stored comment counters of all posts."""
+    Post.objects.update_comment_counts()
+
+
+@task
+def release_scheduled_posts() -> None:
+    """Show posts whose pub_date has come."""
+    release_due_posts()
+
+
+def schedule_releases(posts: QuerySet) -> int:
+    """Queue `release_scheduled_posts` at pub_date of unreleased posts.
+
+    Dates which already have a pending release are skipped, so the
+    command may be run any number of times.
+
+    Returns:
+        Count of queued tasks.
+    """
+    pub_dates = (
+        posts.filter(is_released=False)
+        .order_by('pub_date')
+        .values_list('pub_date', flat=True)
+        .distinct()
+    )
+    queued = set(
+        Task.objects.filter(
+            name=release_scheduled_posts.task_name, status=Task.Status.PENDING
+        ).values_list('run_after', flat=True)
+    )
+    missing = [pub_date for pub_date in pub_dates if pub_date not in queued]
+    for pub_date in missing:
+        release_scheduled_posts.delay(run_after=pub_date)
+    return len(missing)
+
+
+@task
+def notify_post_author(comment_id: int) -> None:
+    """Mail post author about new comment under their post."""
+    comment = (
+        Comment.objects.select_related('author', 'post__author')
+        .filter(pk=comment_id)
+        .first()
+    )
+    if comment is None:
+        return
+    post_author = comment.post.author
+    if not post_author.email or post_author == comment.author:
+        return
+    commenter = (
+        f'@{comment.author.username}'
+        if comment.author is not None
+        else 'удалённого пользователя'
+    )
+    post_url = settings.SITE_URL + reverse(
+        'blog:post_detail', args=(comment.post_id,)
+    )
+    send_mail(
+        subject=f'Новый комментарий к публикации «{comment.post.title}»',
+        message=(
+            f'Новый комментарий от {commenter}:\n\n'
+            f'{comment.text}\n\n'
+            f'{post_url}'
+        ),
+        from_email=None,
+        recipient_list=[post_author.email],
+    )
@@ -0,0 +1,37 @@
+from django import template
+from django.utils.safestring import SafeString
+
+from blog.cache import render_post_card
+from blog.models import Post
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def query_string(context: template.Context, **params) -> str:
+    """Return query string of current request with `params` replaced.
+
+    Parameters set to None are removed.
+    """
+    query = context['request'].GET.copy()
+    for name, value in params.items():
+        query.pop(name, None)
+        if value is not None:
+            query[name] = value
+    return f'?{query.urlencode()}'
+
+
+@register.simple_tag
+def post_card(post: Post) -> SafeString:
+    """Render cached card of the post."""
+    return render_post_card(post)
+
+
+@register.simple_tag
+def image_srcset(post: Post, extension: str) -> str:
+    """Build `srcset` attribute value from renditions of the post image."""
+    storage = post.image.storage
+    return ', '.join(
+        f'{storage.url(name)} {width}w'
+        for width, name in post.image_renditions.get(extension, ())
+    )
@@ -0,0 +1,193 @@
+"""Streaming export and import of blog content.
+
+Content is stored as newline-delimited JSON in the format of Django's
+`jsonl` serializer, one object per line, so files can also be loaded
+with `loaddata`. Models go in the order of their foreign keys. Both
+directions keep a constant amount of objects in memory.
+"""
+
+from collections.abc import Callable, Generator, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from typing import IO
+
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Model
+
+from blog.models import Category, Comment, Location, Post
+
+MODELS: tuple[type[Model], ...] = (
+    get_user_model(),
+    Category,
+    Location,
+    Post,
+    Comment,
+)
+
+
+@contextmanager
+def snapshot(using: str = DEFAULT_DB_ALIAS) -> Generator[None, None, None]:
+    """Read the database as of the first query inside the block.
+
+    SQLite and MySQL transactions read a snapshot already, PostgreSQL
+    does it only with REPEATABLE READ isolation level.
+    """
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY'
+                )
+        yield
+
+
+class PreciseJSONEncoder(DjangoJSONEncoder):
+    """JSON encoder which keeps microseconds of datetimes."""
+
+    def default(self, o: object) -> object:
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class _Counter:
+    """Iterable which counts the items passed through it."""
+
+    def __init__(self, iterable: Iterator) -> None:
+        self.iterable = iterable
+        self.count = 0
+
+    def __iter__(self) -> Iterator:
+        for item in self.iterable:
+            self.count += 1
+            yield item
+
+
+def export_content(
+    stream: IO[str], chunk_size: int = 2000, using: str = DEFAULT_DB_ALIAS
+) -> dict[str, int]:
+    """Write all blog content to the stream.
+
+    Returns:
+        Count of exported objects by model label.
+    """
+    counts = {}
+    with snapshot(using):
+        for model in MODELS:
+            # Many-to-many fields, like permissions of users, would cost
+            # a query per object and are not exported.
+            fields = [field.name for field in model._meta.concrete_fields]
+            counter = _Counter(
+                model._base_manager.using(using)
+                .order_by('pk')
+                .iterator(chunk_size)
+            )
+            serializers.serialize(
+                'jsonl',
+                counter,
+                stream=stream,
+                fields=fields,
+                cls=PreciseJSONEncoder,
+            )
+            counts[model._meta.label] = counter.count
+    return counts
+
+
+@contextmanager
+def keep_create_dates(model: type[Model]) -> Generator[None, None, None]:
+    """Save dates of `auto_now_add` fields as they are in the objects.
+
+    `bulk_create` overwrites them with the current time otherwise.
+    """
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _save_batch(model: type[Model], objects: list[Model], using: str) -> int:
+    """Create objects which are not in the database yet.
+
+    Returns:
+        Count of created objects.
+    """
+    with transaction.atomic(using=using):
+        existing = set(
+            model._base_manager.using(using)
+            .filter(pk__in=[obj.pk for obj in objects])
+            .values_list('pk', flat=True)
+        )
+        new_objects = [obj for obj in objects if obj.pk not in existing]
+        with keep_create_dates(model):
+            model._base_manager.using(using).bulk_create(new_objects)
+    return len(new_objects)
+
+
+def import_content(
+    stream: IO[str],
+    batch_size: int = 1000,
+    using: str = DEFAULT_DB_ALIAS,
+    log: Callable[[str], None] = print,
+) -> dict[str, int]:
+    """Load objects from the stream, skipping ones already present.
+
+    Objects are created by batches of the same model, each in its own
+    transaction, without sending signals. If import fails, running it
+    again with the same file continues after the last saved batch.
+
+    Returns:
+        Count of created objects by model label.
+    """
+    allowed = {model._meta.label for model in MODELS}
+    counts = {}
+    batch: list[Model] = []
+
+    def flush() -> None:
+        model = type(batch[0])
+        created = _save_batch(model, batch, using)
+        label = model._meta.label
+        counts[label] = counts.get(label, 0) + created
+        log(f'{label}: {created} of {len(batch)} objects created')
+        batch.clear()
+
+    for deserialized in serializers.deserialize('jsonl', stream, using=using):
+        obj = deserialized.object
+        if obj._meta.label not in allowed:
+            raise ValueError(f'Unexpected model {obj._meta.label}.')
+        if isinstance(obj, Post) and not obj.excerpt:
+            # Files exported before excerpts were stored.
+            obj.excerpt = Post.make_excerpt(obj.text)
+        if batch and (
+            type(obj) is not type(batch[0]) or len(batch) == batch_size
+        ):
+            flush()
+        batch.append(obj)
+    if batch:
+        flush()
+
+    # Objects were saved with their primary keys, which PostgreSQL
+    # sequences don't know about.
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), MODELS)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return counts
+
+
+def format_counts(counts: dict[str, int]) -> str:
+    return ', '.join(f'{count} {label}' for label, count in counts.items())
@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.urls import path
 
-from blog import views
+from blog import async_views, views
 
 app_name = 'blog'
 
+read_views = async_views if settings.BLOG_ASYNC_VIEWS else views
+
 profile_patterns = [
     path(
         'profile/edit/',
@@ -12,7 +15,7 @@ profile_patterns = [
     ),
     path(
         'profile/<str:username>/',
-        views.ViewProfile.as_view(),
+        read_views.ViewProfile.as_view(),
         name='profile',
     ),
 ]
@@ -20,7 +23,7 @@ profile_patterns = [
 posts_patterns = [
     path(
         'posts/<int:post_id>/',
-        views.PostDetail.as_view(),
+        read_views.PostDetail.as_view(),
         name='post_detail',
     ),
     path(
@@ -59,10 +62,11 @@ comment_patterns = [
 ]
 
 urlpatterns = [
-    path('', views.Index.as_view(), name='index'),
+    path('', read_views.Index.as_view(), name='index'),
+    path('search/', views.Search.as_view(), name='search'),
     path(
         'category/<slug:category_slug>/',
-        views.CategoryPosts.as_view(),
+        read_views.CategoryPosts.as_view(),
         name='category_posts',
     ),
     *profile_patterns,
@@ -1,11 +1,13 @@
 from typing import Any
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models.query import QuerySet
-from django.http import HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.functional import cached_property
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -14,37 +16,58 @@ from django.views.generic import (
     UpdateView,
 )
 
-from blog.constants import POSTS_ON_PAGE
+from blog import feeds
+from blog.constants import COMMENTS_ON_PAGE, POSTS_ON_PAGE
 from blog.forms import CommentForm, PostForm, ProfileForm
 from blog.mixins import (
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    FeedPaginationMixin,
+    MaterializedFeedMixin,
     OnlyAuthorMixin,
     RedirectToPostPageMixin,
     RedirectToProfileMixin,
 )
 from blog.models import Category, Comment, Post
+from blog.paginators import CommentPaginator, FeedPaginator
 
 User = get_user_model()
 
 
-class Index(ListView):
+class Index(
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    FeedPaginationMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = POSTS_ON_PAGE
 
+    def get_page_cache_scopes(self) -> list[tuple[str, int | None]]:
+        return [('feed', None)]
+
+    def get_scheduled_posts(self) -> QuerySet[Any]:
+        return Post.objects.get_scheduled()
+
     def get_queryset(self) -> QuerySet[Any]:
-        return super().get_queryset().select_all_related().get_published()
+        return super().get_queryset().for_cards().get_published()
 
 
-class PostDetail(DetailView):
+class PostDetail(AnonymousPageCacheMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
+    page_cache_params = ('comments_page',)
+
+    def get_page_cache_scopes(self) -> list[tuple[str, int | None]]:
+        return [('post', self.kwargs['post_id'])]
 
     def get_queryset(self) -> QuerySet[Any]:
         return (
             super()
             .get_queryset()
-            .select_all_related()
+            .for_detail()
             .get_all_for_user(self.request.user)
         )
 
@@ -52,7 +75,9 @@ class PostDetail(DetailView):
         context = super().get_context_data(**kwargs)
         if not self.request.user.is_anonymous:
             context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = CommentPaginator(
+            self.object, COMMENTS_ON_PAGE
+        ).get_page(self.request.GET.get('comments_page'))
         return context
 
 
@@ -74,7 +99,7 @@ class EditPost(OnlyAuthorMixin, RedirectToPostPageMixin, UpdateView):
 
 
 class DeletePost(OnlyAuthorMixin, RedirectToProfileMixin, DeleteView):
-    model = Post
+    queryset = Post.objects.select_related('location')
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
@@ -84,26 +109,45 @@ class DeletePost(OnlyAuthorMixin, RedirectToProfileMixin, DeleteView):
         return context
 
 
-class ViewProfile(ListView):
+class ViewProfile(
+    AnonymousPageCacheMixin,
+    MaterializedFeedMixin,
+    CursorPaginationMixin,
+    FeedPaginationMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/profile.html'
     paginate_by = POSTS_ON_PAGE
 
+    @cached_property
+    def profile(self) -> AbstractBaseUser | None:
+        return User.objects.filter(username=self.kwargs['username']).first()
+
+    def get_page_cache_scopes(self) -> list[tuple[str, int]] | None:
+        if self.profile is None:
+            return None
+        return [('author-feed', self.profile.pk)]
+
+    def get_scheduled_posts(self) -> QuerySet[Any]:
+        return Post.objects.get_scheduled().filter(author=self.profile)
+
+    def get_count_cache_name(self) -> str:
+        # Profile owner also sees their unpublished posts.
+        is_owner = self.request.user.username == self.kwargs['username']
+        return f'{super().get_count_cache_name()}:{is_owner}'
+
     def get_queryset(self) -> QuerySet[Any]:
-        return (
-            super()
-            .get_queryset()
-            .select_all_related()
-            .get_all_for_user(self.request.user)
-            .filter(author__username=self.kwargs['username'])
-        )
+        if self.profile is None:
+            raise Http404('Пользователь не найден.')
+        posts = super().get_queryset().for_cards()
+        if feeds.is_enabled() and self.request.user != self.profile:
+            return self.read_feed(posts, feeds.author_scope(self.profile.pk))
+        return posts.get_author_posts(self.profile, self.request.user)
 
     def get_context_data(self, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        profile_owner = get_object_or_404(
-            User, username=self.kwargs['username']
-        )
-        context['profile'] = profile_owner
+        context['profile'] = self.profile
         return context
 
 
@@ -122,23 +166,39 @@ def edit_profile(request: HttpRequest) -> HttpResponse:
     )
 
 
-class CategoryPosts(ListView):
+class CategoryPosts(
+    AnonymousPageCacheMixin,
+    MaterializedFeedMixin,
+    CursorPaginationMixin,
+    FeedPaginationMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/category.html'
     paginate_by = POSTS_ON_PAGE
 
+    @cached_property
+    def category(self) -> Category | None:
+        return Category.objects.filter(
+            is_published=True, slug=self.kwargs['category_slug']
+        ).first()
+
+    def get_page_cache_scopes(self) -> list[tuple[str, int]] | None:
+        if self.category is None:
+            return None
+        return [('category-feed', self.category.pk)]
+
+    def get_scheduled_posts(self) -> QuerySet[Any]:
+        return Post.objects.get_scheduled().filter(category=self.category)
+
     def get_queryset(self) -> QuerySet[Any]:
-        self.category = get_object_or_404(
-            Category.objects.filter(is_published=True),
-            slug=self.kwargs['category_slug'],
-        )
-        return (
-            super()
-            .get_queryset()
-            .select_all_related()
-            .get_published()
-            .filter(category__slug=self.kwargs['category_slug'])
-        )
+        if self.category is None:
+            raise Http404('Категория не найдена.')
+        posts = super().get_queryset().for_cards()
+        if feeds.is_enabled():
+            scope = feeds.category_scope(self.category.pk)
+            return self.read_feed(posts, scope)
+        return posts.get_published().filter(category=self.category)
 
     def get_context_data(self, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -167,11 +227,7 @@ class EditComment(OnlyAuthorMixin, RedirectToPostPageMixin, UpdateView):
     pk_url_kwarg = 'comment_id'
 
     def get_queryset(self) -> QuerySet[Any]:
-        return (
-            super()
-            .get_queryset()
-            .filter(post=get_object_or_404(Post, id=self.kwargs['post_id']))
-        )
+        return super().get_queryset().filter(post_id=self.kwargs['post_id'])
 
 
 class DeleteComment(OnlyAuthorMixin, RedirectToPostPageMixin, DeleteView):
@@ -180,8 +236,26 @@ class DeleteComment(OnlyAuthorMixin, RedirectToPostPageMixin, DeleteView):
     pk_url_kwarg = 'comment_id'
 
     def get_queryset(self) -> QuerySet[Any]:
+        return super().get_queryset().filter(post_id=self.kwargs['post_id'])
+
+
+class Search(ListView):
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = POSTS_ON_PAGE
+    paginator_class = FeedPaginator
+
+    def get_queryset(self) -> QuerySet[Any]:
+        self.query = self.request.GET.get('q', '').strip()
         return (
             super()
             .get_queryset()
-            .filter(post=get_object_or_404(Post, id=self.kwargs['post_id']))
+            .for_cards()
+            .get_published()
+            .search(self.query)
         )
+
+    def get_context_data(self, **kwargs) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.utils.module_loading import autodiscover_modules
+
+from core.templating import compile_templates
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self) -> None:
+        import core.checks  # noqa: F401
+        import core.signals  # noqa: F401
+
+        # Register tasks of all apps for `run_worker` command.
+        autodiscover_modules('tasks')
+
+        if settings.TEMPLATES_WARMUP:
+            compile_templates()
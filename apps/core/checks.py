@@ -0,0 +1,17 @@
+from django.core.checks import CheckMessage, Error, Tags, register
+
+from core.templating import compile_templates
+
+
+@register(Tags.templates, deploy=True)
+def check_templates_compile(
+    app_configs: list | None, **kwargs
+) -> list[CheckMessage]:
+    """Fail deploy check if any project template has syntax error."""
+    return [
+        Error(
+            f'Template {name} cannot be compiled: {error}',
+            id='core.E001',
+        )
+        for name, error in compile_templates().items()
+    ]
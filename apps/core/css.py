@@ -0,0 +1,168 @@
+"""Pruning of unused rules from stylesheets.
+
+Parser understands just enough of CSS syntax for minified frameworks:
+style rules, statement at-rules and at-rules with nested rules or with
+raw blocks (`@keyframes`, `@font-face`).
+"""
+
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+NESTED_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+_comment = re.compile(r'/\*(?!!).*?\*/', re.DOTALL)
+_word = re.compile(r'[A-Za-z][\w-]*')
+_class = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+_type = re.compile(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)')
+_attribute = re.compile(r'\[[^\]]*\]')
+_negation = re.compile(r':(?:not|where)\([^()]*(?:\([^()]*\))?[^()]*\)')
+_pseudo = re.compile(r'::?[\w-]+(?:\([^()]*\))?')
+
+
+class Node:
+    """CSS rule or at-rule.
+
+    Body is a string of declarations, a list of nested nodes or None for
+    statements like `@charset` and preserved `/*!` comments.
+    """
+
+    def __init__(self, prelude: str, body: str | list['Node'] | None) -> None:
+        self.prelude = prelude
+        self.body = body
+
+    def __str__(self) -> str:
+        if self.body is None:
+            if self.prelude.startswith('/*'):
+                return self.prelude
+            return f'{self.prelude};'
+        if isinstance(self.body, list):
+            return f'{self.prelude}{{{serialize(self.body)}}}'
+        return f'{self.prelude}{{{self.body}}}'
+
+
+def parse(css: str) -> list[Node]:
+    """Parse stylesheet into nodes, dropping all but `/*!` comments."""
+    nodes, _ = _parse_block(_comment.sub('', css), 0)
+    return nodes
+
+
+def serialize(nodes: Iterable[Node]) -> str:
+    return ''.join(map(str, nodes))
+
+
+def _skip_string(css: str, pos: int) -> int:
+    quote = css[pos]
+    pos += 1
+    while css[pos] != quote:
+        pos += 2 if css[pos] == '\\' else 1
+    return pos + 1
+
+
+def _find_block_end(css: str, pos: int) -> int:
+    """Return position of `}` closing the block which starts at `pos`."""
+    depth = 0
+    while True:
+        char = css[pos]
+        if char in '"\'':
+            pos = _skip_string(css, pos)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return pos
+        pos += 1
+
+
+def _parse_block(css: str, pos: int) -> tuple[list[Node], int]:
+    nodes = []
+    start = pos
+    while pos < len(css):
+        char = css[pos]
+        if char in '"\'':
+            pos = _skip_string(css, pos)
+            continue
+
+        if css.startswith('/*!', pos):
+            end = css.index('*/', pos) + 2
+            nodes.append(Node(css[pos:end], None))
+            pos = start = end
+            continue
+
+        prelude = css[start:pos].strip()
+        if char == '{':
+            if prelude.startswith(NESTED_AT_RULES):
+                children, pos = _parse_block(css, pos + 1)
+                nodes.append(Node(prelude, children))
+            else:
+                end = _find_block_end(css, pos)
+                nodes.append(Node(prelude, css[pos + 1 : end]))
+                pos = end + 1
+            start = pos
+            continue
+        if char == '}':
+            return nodes, pos + 1
+        if char == ';' and prelude.startswith('@'):
+            nodes.append(Node(prelude, None))
+            start = pos + 1
+        pos += 1
+    return nodes, pos
+
+
+def split_selectors(selector_list: str) -> list[str]:
+    """Split selector list by commas outside of parentheses."""
+    selectors = []
+    depth = 0
+    start = 0
+    for pos, char in enumerate(selector_list):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(selector_list[start:pos])
+            start = pos + 1
+    selectors.append(selector_list[start:])
+    return [selector.strip() for selector in selectors]
+
+
+def is_selector_used(selector: str, words: set[str]) -> bool:
+    """Tell if all classes and element names of selector are used.
+
+    Classes inside `:not()` and `:where()` don't have to be used.
+    """
+    selector = _negation.sub('', _attribute.sub('', selector))
+    selector = _pseudo.sub('', selector)
+    names = [*_class.findall(selector), *_type.findall(selector)]
+    return all(name in words for name in names)
+
+
+def prune(nodes: list[Node], words: set[str]) -> list[Node]:
+    """Drop rules with selectors not matching any of `words`."""
+    pruned = []
+    for node in nodes:
+        if isinstance(node.body, list):
+            children = prune(node.body, words)
+            if children:
+                pruned.append(Node(node.prelude, children))
+        elif node.body is None or node.prelude.startswith('@'):
+            pruned.append(node)
+        else:
+            selectors = [
+                selector
+                for selector in split_selectors(node.prelude)
+                if is_selector_used(selector, words)
+            ]
+            if selectors:
+                pruned.append(Node(','.join(selectors), node.body))
+    return pruned
+
+
+def find_words(paths: Iterable[Path]) -> set[str]:
+    """Collect every word which may be a class or element name."""
+    words = set()
+    for path in paths:
+        words.update(_word.findall(path.read_text(encoding='utf-8')))
+    return words
@@ -0,0 +1,145 @@
+from pathlib import Path
+
+import django_bootstrap5
+from django import forms
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.utils.module_loading import autodiscover_modules
+from django_bootstrap5.components import ALERT_TYPES
+
+from core import css
+
+CSS_DIR = settings.BASE_DIR / 'static_dev' / 'css'
+TEMPLATES_DIR = settings.BASE_DIR / 'templates'
+
+SOURCE_STYLESHEET = CSS_DIR / 'bootstrap.min.css'
+PRUNED_STYLESHEET = CSS_DIR / 'bootstrap.pruned.min.css'
+CRITICAL_TEMPLATE = TEMPLATES_DIR / 'includes' / 'critical_css.html'
+
+# Templates rendered at the top of most pages.
+CRITICAL_TEMPLATES = (
+    'base.html',
+    'includes/header.html',
+    'includes/post_card.html',
+)
+
+# Packages whose forms may set classes of widgets.
+PROJECT_APPS = tuple(
+    f'{path.name}.' for path in (settings.BASE_DIR / 'apps').iterdir()
+)
+
+# Modules of django_bootstrap5 which compose classes of rendered markup.
+BOOTSTRAP_MODULES = ('components.py', 'core.py', 'renderers.py')
+
+# Classes which django_bootstrap5 composes at runtime.
+SAFELIST = {
+    *(f'alert-{alert_type}' for alert_type in ALERT_TYPES),
+    *(
+        f'{prefix}-{size}'
+        for prefix in ('btn', 'form-control', 'form-select', 'input-group')
+        for size in ('sm', 'lg')
+    ),
+}
+
+
+def find_content_files() -> list[Path]:
+    """Return templates and modules of django_bootstrap5 rendering markup.
+
+    Python sources of the project are not scanned, as their identifiers
+    match too many class names. Classes set by project forms are found
+    by `find_widget_classes`.
+    """
+    bootstrap_dir = Path(django_bootstrap5.__file__).parent
+    return [
+        *(
+            path
+            for path in TEMPLATES_DIR.rglob('*.html')
+            if path != CRITICAL_TEMPLATE
+        ),
+        *(settings.BASE_DIR / 'apps').glob('*/templates/**/*.html'),
+        # Markup of forms, buttons and alerts is rendered by the library.
+        *bootstrap_dir.rglob('*.html'),
+        *(bootstrap_dir / name for name in BOOTSTRAP_MODULES),
+    ]
+
+
+def find_widget_classes() -> set[str]:
+    """Return classes set in widget attrs of project forms."""
+    autodiscover_modules('forms')
+    found = set()
+    form_classes = [forms.BaseForm]
+    while form_classes:
+        form_class = form_classes.pop()
+        form_classes.extend(form_class.__subclasses__())
+        if not form_class.__module__.startswith(PROJECT_APPS):
+            continue
+        for field in getattr(form_class, 'base_fields', {}).values():
+            found.update(field.widget.attrs.get('class', '').split())
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        'Prune unused rules from bootstrap.min.css and generate critical'
+        ' CSS inlined into base.html. Run it after changing templates.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Fail if generated files are outdated instead of writing.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        rules = css.parse(SOURCE_STYLESHEET.read_text(encoding='utf-8'))
+        pruned = css.prune(
+            rules,
+            css.find_words(find_content_files())
+            | find_widget_classes()
+            | SAFELIST,
+        )
+        critical = [
+            rule
+            for rule in css.prune(
+                pruned,
+                css.find_words(
+                    TEMPLATES_DIR / name for name in CRITICAL_TEMPLATES
+                ),
+            )
+            # Encoding declarations are not allowed in <style>.
+            if not rule.prelude.startswith('@charset')
+        ]
+        outputs = {
+            PRUNED_STYLESHEET: css.serialize(pruned) + '\n',
+            CRITICAL_TEMPLATE: (
+                '{% verbatim %}<style>'
+                f'{css.serialize(critical)}'
+                '</style>{% endverbatim %}\n'
+            ),
+        }
+
+        if options['check']:
+            outdated = [
+                str(path.relative_to(settings.BASE_DIR))
+                for path, content in outputs.items()
+                if not path.exists()
+                or path.read_text(encoding='utf-8') != content
+            ]
+            if outdated:
+                raise CommandError(
+                    f'Outdated: {", ".join(outdated)}. Run build_css.'
+                )
+            return
+
+        for path, content in outputs.items():
+            path.write_text(content, encoding='utf-8')
+            self.stdout.write(
+                f'{path.relative_to(settings.BASE_DIR)}: '
+                f'{len(content.encode()) // 1024} KiB'
+            )
+        self.stdout.write(self.style.SUCCESS('Stylesheets are built.'))
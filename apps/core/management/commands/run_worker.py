@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from core.queue import work
+
+
+class Command(BaseCommand):
+    help = 'Execute background tasks queued in the database.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Count of tasks executed concurrently.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait for new tasks when the queue is empty.',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once there are no due tasks left.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        executed = work(
+            threads=options['threads'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Executed {executed} tasks.'))
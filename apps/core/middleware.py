@@ -0,0 +1,172 @@
+import mimetypes
+import re
+from collections.abc import Callable
+from pathlib import Path
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+
+from core.storage import ENCODINGS
+from core.timing import RequestTimer, request_stats, time_request
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+CACHE_CONTROL = 'public, max-age=60'
+
+_rejected_encoding = re.compile(r';\s*q=0(\.0*)?$')
+
+
+class StaticFile:
+    """Collected static file with its precompressed variants."""
+
+    def __init__(self, path: Path, immutable: bool) -> None:
+        self.path = path
+        self.content_type = (
+            mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        )
+        self.cache_control = (
+            IMMUTABLE_CACHE_CONTROL if immutable else CACHE_CONTROL
+        )
+        self.encodings = {
+            encoding: path.with_name(path.name + extension)
+            for extension, encoding in ENCODINGS.items()
+            if path.with_name(path.name + extension).exists()
+        }
+
+    def get_response(self, accept_encoding: str) -> HttpResponse:
+        accepted = {
+            item.split(';')[0].strip().lower()
+            for item in accept_encoding.split(',')
+            if not _rejected_encoding.search(item.strip())
+        }
+        path, encoding = self.path, None
+        for name, variant_path in self.encodings.items():
+            if name in accepted:
+                path, encoding = variant_path, name
+                break
+
+        content = path.read_bytes()
+        response = HttpResponse(content, content_type=self.content_type)
+        response['Content-Length'] = len(content)
+        response['Cache-Control'] = self.cache_control
+        if self.encodings:
+            response['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return response
+
+
+class StaticFilesMiddleware:
+    """Serve files collected into `STATIC_ROOT`.
+
+    Files are indexed on startup. Names hashed by manifest storage never
+    change content, so they are cached by browsers for a year. Brotli
+    or gzip variant is served when the client accepts it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        if not settings.STATIC_ROOT or not settings.STATIC_URL.startswith('/'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.files = self.index_files(Path(settings.STATIC_ROOT))
+
+    @staticmethod
+    def index_files(root: Path) -> dict[str, StaticFile]:
+        hashed_names = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values()
+        )
+        files = {}
+        for path in root.rglob('*'):
+            if not path.is_file() or path.suffix in ENCODINGS:
+                continue
+            name = path.relative_to(root).as_posix()
+            files[settings.STATIC_URL + name] = StaticFile(
+                path, immutable=name in hashed_names
+            )
+        return files
+
+    def serve(self, request: HttpRequest) -> HttpResponse | None:
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return None
+        return static_file.get_response(
+            request.headers.get('Accept-Encoding', '')
+        )
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        return self.serve(request) or await self.get_response(request)
+
+
+class ServerTimingMiddleware:
+    """Report time spent on the request in `Server-Timing` header.
+
+    The header is sent only with `DEBUG` on or to staff users, as it
+    tells database time and query count. Total time, time of SQL queries
+    with their count and template render time are also added to
+    `core.timing.request_stats` under the URL name of the view for every
+    request. Put it first in `MIDDLEWARE` to time the rest.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def shows_timing(request: HttpRequest) -> bool:
+        """Tell if the client may see timing of the request."""
+        user = getattr(request, 'user', None)
+        return settings.DEBUG or (user is not None and user.is_staff)
+
+    @staticmethod
+    def report(
+        request: HttpRequest,
+        response: HttpResponse,
+        timer: RequestTimer,
+        show_header: bool,
+    ) -> None:
+        if show_header:
+            response['Server-Timing'] = timer.get_header()
+        if request.resolver_match is not None:
+            request_stats.add(
+                request.resolver_match.view_name, timer.get_metrics()
+            )
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with time_request() as timer:
+            response = self.get_response(request)
+        self.report(request, response, timer, self.shows_timing(request))
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        with time_request() as timer:
+            response = await self.get_response(request)
+        # Lazy user is loaded from the session by sync code.
+        show_header = settings.DEBUG or await sync_to_async(self.shows_timing)(
+            request
+        )
+        self.report(request, response, timer, show_header)
+        return response
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Publishable(models.Model):
@@ -23,3 +24,47 @@ class ContainsCreateDate(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Task(ContainsCreateDate):
+    """Deferred function call, executed by `run_worker` command."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    name = models.CharField('Функция', max_length=256)
+    args = models.JSONField('Аргументы', default=list, blank=True)
+    kwargs = models.JSONField(
+        'Именованные аргументы', default=dict, blank=True
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=3
+    )
+    run_after = models.DateTimeField('Выполнить после', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('run_after',)
+        indexes = (
+            models.Index(
+                fields=('run_after',),
+                condition=models.Q(status='pending'),
+                name='task_pending_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.name} ({self.get_status_display()})'
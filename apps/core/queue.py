@@ -0,0 +1,247 @@
+"""Small task queue stored in the database.
+
+Functions decorated with `task` get `delay` method, which stores the call
+in `Task` table inside the current transaction, so the task is queued
+only if the write that caused it is committed. `delay(run_after=...)`
+postpones the call until the given time, `delay(unique=True)` doesn't
+queue a call which is already pending. `run_worker` management
+command picks queued tasks and executes them in a thread pool. While
+running, it also requeues tasks of crashed workers and deletes finished
+tasks after a while.
+"""
+
+import logging
+import time
+import traceback
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import datetime, timedelta
+from functools import partial
+
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import Task
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = timedelta(seconds=30)
+LOCK_TIMEOUT = timedelta(minutes=30)
+# How often a running worker requeues stale and deletes finished tasks.
+MAINTENANCE_INTERVAL = timedelta(minutes=5)
+# How long finished tasks are kept, failed ones are kept for debugging.
+DONE_TASK_RETENTION = timedelta(days=1)
+FAILED_TASK_RETENTION = timedelta(days=30)
+
+_registry: dict[str, Callable] = {}
+
+
+def task(func: Callable | None = None, *, max_attempts: int = 3) -> Callable:
+    """Register function as a task, which can be queued with `delay`."""
+    if func is None:
+        return partial(task, max_attempts=max_attempts)
+
+    name = f'{func.__module__}.{func.__qualname__}'
+    _registry[name] = func
+    func.task_name = name
+    func.delay = partial(enqueue, name, max_attempts=max_attempts)
+    return func
+
+
+def enqueue(
+    name: str,
+    *args,
+    max_attempts: int = 3,
+    run_after: datetime | None = None,
+    unique: bool = False,
+    **kwargs,
+) -> Task:
+    """Queue call of registered task with JSON-serializable arguments.
+
+    Task is executed right away or, if `run_after` is given, once that
+    time comes. With `unique` a pending task with the same name,
+    arguments and `run_after` is returned instead of queueing another.
+    """
+    if name not in _registry:
+        raise KeyError(f'Task {name} is not registered.')
+    run_after = run_after or timezone.now()
+    if unique:
+        pending = Task.objects.filter(
+            name=name, status=Task.Status.PENDING, run_after=run_after
+        )
+        for queued in pending:
+            if queued.args == list(args) and queued.kwargs == kwargs:
+                return queued
+    return Task.objects.create(
+        name=name,
+        args=args,
+        kwargs=kwargs,
+        max_attempts=max_attempts,
+        run_after=run_after,
+    )
+
+
+def requeue_stale_tasks() -> int:
+    """Return tasks locked by crashed workers back to the queue."""
+    return Task.objects.filter(
+        status=Task.Status.RUNNING,
+        locked_at__lt=timezone.now() - LOCK_TIMEOUT,
+    ).update(status=Task.Status.PENDING, locked_at=None)
+
+
+def delete_finished_tasks() -> int:
+    """Delete tasks finished longer ago than their retention period."""
+    now = timezone.now()
+    deleted, _ = Task.objects.filter(
+        Q(status=Task.Status.DONE, run_after__lt=now - DONE_TASK_RETENTION)
+        | Q(
+            status=Task.Status.FAILED,
+            run_after__lt=now - FAILED_TASK_RETENTION,
+        )
+    ).delete()
+    return deleted
+
+
+def _maintain_queue() -> None:
+    try:
+        requeue_stale_tasks()
+        delete_finished_tasks()
+    except DatabaseError:
+        logger.exception('Failed to maintain the queue')
+
+
+def _due_task_ids(now: datetime, limit: int) -> list[int]:
+    return list(
+        Task.objects.select_for_update(skip_locked=True)
+        .filter(status=Task.Status.PENDING, run_after__lte=now)
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def claim_tasks(limit: int) -> list[Task]:
+    """Lock up to `limit` due tasks for the current worker.
+
+    SQLite has no row locks, so another worker may select the same
+    tasks. Each task is claimed by an update which checks that it is
+    still pending, and only tasks updated here are returned.
+    """
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        for task_id in _due_task_ids(now, limit):
+            updated = Task.objects.filter(
+                pk=task_id, status=Task.Status.PENDING
+            ).update(
+                status=Task.Status.RUNNING,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if updated:
+                claimed.append(task_id)
+    return list(Task.objects.filter(pk__in=claimed))
+
+
+def run_task(queued: Task) -> None:
+    """Execute claimed task, scheduling retry with backoff on failure."""
+    try:
+        _registry[queued.name](*queued.args, **queued.kwargs)
+    except Exception:
+        logger.exception('Task %s (%s) failed', queued.pk, queued.name)
+        queued.last_error = traceback.format_exc()
+        if queued.attempts < queued.max_attempts:
+            queued.status = Task.Status.PENDING
+            backoff = 2 ** (queued.attempts - 1)
+            queued.run_after = timezone.now() + RETRY_DELAY * backoff
+        else:
+            queued.status = Task.Status.FAILED
+    else:
+        queued.status = Task.Status.DONE
+    queued.locked_at = None
+    try:
+        queued.save(
+            update_fields=('status', 'run_after', 'locked_at', 'last_error')
+        )
+    except DatabaseError:
+        # Task stays locked until a worker requeues it after LOCK_TIMEOUT.
+        logger.exception('Result of task %s was not saved', queued.pk)
+
+
+def _run_in_thread(queued: Task) -> None:
+    try:
+        run_task(queued)
+    finally:
+        close_old_connections()
+
+
+def _start_tasks(
+    tasks: list[Task],
+    executor: ThreadPoolExecutor | None,
+    running: set[Future],
+) -> None:
+    """Submit tasks to executor, or run them in place without it."""
+    if executor is None:
+        for queued in tasks:
+            run_task(queued)
+        return
+    running.update(executor.submit(_run_in_thread, queued) for queued in tasks)
+
+
+def work(
+    threads: int = 4,
+    poll_interval: float = 1.0,
+    burst: bool = False,
+) -> int:
+    """Process queued tasks until stopped.
+
+    New tasks are claimed as soon as a thread is free, so a slow task
+    doesn't hold up the others.
+
+    Args:
+        threads: Count of tasks executed concurrently. With one thread
+            tasks are executed in the calling thread.
+        poll_interval: Seconds to wait when the queue is empty.
+        burst: Stop once there are no due tasks left.
+
+    Returns:
+        Count of executed tasks.
+    """
+    executed = 0
+    maintenance_at = time.monotonic()
+    executor = ThreadPoolExecutor(threads) if threads > 1 else None
+    running: set[Future] = set()
+    try:
+        while True:
+            if time.monotonic() >= maintenance_at:
+                _maintain_queue()
+                maintenance_at = (
+                    time.monotonic() + MAINTENANCE_INTERVAL.total_seconds()
+                )
+            tasks = []
+            if len(running) < threads:
+                try:
+                    tasks = claim_tasks(threads - len(running))
+                except DatabaseError:
+                    # E.g. "database is locked", the worker keeps polling.
+                    logger.exception('Failed to claim tasks')
+                    time.sleep(poll_interval)
+                    continue
+            _start_tasks(tasks, executor, running)
+            executed += len(tasks)
+            if running:
+                # Wake up when a thread is free or new tasks may be due.
+                _, running = wait(
+                    running, timeout=poll_interval, return_when=FIRST_COMPLETED
+                )
+            elif not tasks:
+                if burst:
+                    return executed
+                time.sleep(poll_interval)
+    finally:
+        if executor is not None:
+            executor.shutdown()
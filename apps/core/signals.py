@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.timing import time_query
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(
+    sender: type[BaseDatabaseWrapper],
+    connection: BaseDatabaseWrapper,
+    **kwargs,
+) -> None:
+    """Tune new SQLite connection with `SQLITE_PRAGMAS` setting."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def install_query_timer(
+    sender: type[BaseDatabaseWrapper],
+    connection: BaseDatabaseWrapper,
+    **kwargs,
+) -> None:
+    """Time queries of the connection for `Server-Timing` header."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
@@ -0,0 +1,77 @@
+import gzip
+from collections.abc import Callable, Iterator
+from functools import partial
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css',
+    '.js',
+    '.json',
+    '.map',
+    '.svg',
+    '.txt',
+    '.xml',
+    '.ico',
+)
+
+# Extension of compressed variant and Content-Encoding it is served with.
+ENCODINGS = {'.br': 'br', '.gz': 'gzip'}
+
+COMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    '.br': brotli.compress,
+    '.gz': partial(gzip.compress, compresslevel=9, mtime=0),
+}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage, which also saves brotli and gzip variants.
+
+    Variants are saved next to original and hashed files with `.br` and
+    `.gz` extensions, only if they are noticeably smaller.
+    """
+
+    # Vendored assets refer to source maps, which are not shipped.
+    patterns = tuple(
+        (
+            extension,
+            tuple(
+                pattern
+                for pattern in extension_patterns
+                if 'sourceMappingURL' not in str(pattern)
+            ),
+        )
+        for extension, extension_patterns in (
+            ManifestStaticFilesStorage.patterns
+        )
+    )
+
+    def post_process(
+        self, paths: dict, dry_run: bool = False, **options
+    ) -> Iterator[tuple]:
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        names = {*paths, *self.hashed_files.values()}
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                for compressed_name in self.compress(name):
+                    yield name, compressed_name, True
+
+    def compress(self, name: str) -> Iterator[str]:
+        """Save compressed variants of the file, yielding their names."""
+        with self.open(name) as file:
+            content = file.read()
+
+        for extension, compressor in COMPRESSORS.items():
+            compressed = compressor(content)
+            if len(compressed) > len(content) * 0.95:
+                continue
+            compressed_name = name + extension
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            yield compressed_name
@@ -0,0 +1,64 @@
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from django.http import HttpRequest
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.base import BaseEngine
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.safestring import SafeString
+
+from core.timing import time_template
+
+
+class TimedTemplate(Template):
+    def render(
+        self,
+        context: dict[str, Any] | None = None,
+        request: HttpRequest | None = None,
+    ) -> SafeString:
+        with time_template():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template backend, which reports render time to the timer.
+
+    Only templates loaded through the backend are timed, so includes and
+    other nested templates count as part of their parent.
+    """
+
+    def from_string(self, template_code: str) -> TimedTemplate:
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name: str) -> TimedTemplate:
+        return TimedTemplate(
+            super().get_template(template_name).template, self
+        )
+
+
+def find_templates(backend: BaseEngine) -> Iterator[str]:
+    """Yield names of templates from `DIRS` of the template backend."""
+    for directory in map(Path, backend.dirs):
+        for path in sorted(directory.rglob('*')):
+            if path.is_file():
+                yield path.relative_to(directory).as_posix()
+
+
+def compile_templates() -> dict[str, TemplateSyntaxError]:
+    """Compile every project template.
+
+    With cached template loader compiled templates stay in memory, so the
+    first requests don't pay for reading and parsing them.
+
+    Returns:
+        Syntax errors of templates which failed to compile, by name.
+    """
+    errors = {}
+    for backend in engines.all():
+        for name in find_templates(backend):
+            try:
+                backend.get_template(name)
+            except TemplateSyntaxError as exc:
+                errors[name] = exc
+    return errors
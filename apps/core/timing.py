@@ -0,0 +1,180 @@
+"""Per-request timings of SQL queries, template rendering and views.
+
+`core.middleware.ServerTimingMiddleware` starts `RequestTimer` for every
+request. Queries are timed by `time_query`, installed on each database
+connection, and templates by `core.templating.TimedDjangoTemplates`.
+Metrics of finished requests are added to in-process histograms per URL
+name, see `request_stats`.
+"""
+
+import time
+from collections.abc import Callable, Generator, Mapping, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any
+
+# Upper bounds of histogram buckets, in ms for timings.
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_current_timer: ContextVar['RequestTimer | None'] = ContextVar(
+    'request_timer', default=None
+)
+
+
+class RequestTimer:
+    """Time spent by the current request, in seconds."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.db_time = 0.0
+        self.queries = 0
+        self.template_time = 0.0
+        self.rendering = False
+
+    def stop(self) -> None:
+        self.total = time.perf_counter() - self.start
+
+    def get_metrics(self) -> dict[str, float]:
+        """Return timings in ms and count of queries."""
+        return {
+            'total': self.total * 1000,
+            'db': self.db_time * 1000,
+            'queries': self.queries,
+            'template': self.template_time * 1000,
+        }
+
+    def get_header(self) -> str:
+        """Return value of `Server-Timing` header."""
+        return (
+            f'total;dur={self.total * 1000:.1f}, '
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f'template;dur={self.template_time * 1000:.1f}'
+        )
+
+
+@contextmanager
+def time_request() -> Generator[RequestTimer, None, None]:
+    """Make new timer current for the code inside the block."""
+    timer = RequestTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        timer.stop()
+        _current_timer.reset(token)
+
+
+@contextmanager
+def time_template() -> Generator[None, None, None]:
+    """Add time of the block to template time of the current request.
+
+    Templates rendered while another one is rendering are not counted
+    twice.
+    """
+    timer = _current_timer.get()
+    if timer is None or timer.rendering:
+        yield
+        return
+
+    timer.rendering = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.template_time += time.perf_counter() - start
+        timer.rendering = False
+
+
+def time_query(
+    execute: Callable,
+    sql: str,
+    params: Sequence | Mapping | None,
+    many: bool,
+    context: dict,
+) -> object:
+    """Database execute wrapper counting queries of the current request."""
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.db_time += time.perf_counter() - start
+        timer.queries += 1
+
+
+class Histogram:
+    """Distribution of values over `BUCKETS`."""
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        index = next(
+            (i for i, bound in enumerate(BUCKETS) if value <= bound),
+            len(BUCKETS),
+        )
+        self.buckets[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate percentile by upper bound of its bucket."""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+            'buckets': dict(
+                zip([*map(str, BUCKETS), 'inf'], self.buckets, strict=True)
+            ),
+        }
+
+
+class RequestStats:
+    """Histograms of request metrics per URL name in the current process."""
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.histograms: dict[str, dict[str, Histogram]] = {}
+
+    def add(self, url_name: str, metrics: dict[str, float]) -> None:
+        with self.lock:
+            histograms = self.histograms.setdefault(url_name, {})
+            for metric, value in metrics.items():
+                histograms.setdefault(metric, Histogram()).add(value)
+
+    def as_dict(self) -> dict[str, dict[str, dict[str, Any]]]:
+        with self.lock:
+            return {
+                url_name: {
+                    metric: histogram.as_dict()
+                    for metric, histogram in histograms.items()
+                }
+                for url_name, histograms in sorted(self.histograms.items())
+            }
+
+
+request_stats = RequestStats()
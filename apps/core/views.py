@@ -1,10 +1,14 @@
 from django.contrib.auth import login
 from django.contrib.auth.forms import UserCreationForm
-from django.http import HttpResponse
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
+from django.views import View
 from django.views.generic import CreateView
 
+from core.timing import request_stats
+
 
 class Registration(CreateView):
     template_name = 'registration/registration_form.html'
@@ -17,3 +21,13 @@ class Registration(CreateView):
         login(self.request, user)
 
         return redirect(self.success_url)
+
+
+class ServerTimings(UserPassesTestMixin, View):
+    """Dump request timing histograms of this process for staff."""
+
+    def test_func(self) -> bool:
+        return self.request.user.is_staff
+
+    def get(self, request: HttpRequest) -> JsonResponse:
+        return JsonResponse(request_stats.as_dict())
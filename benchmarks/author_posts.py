@@ -0,0 +1,111 @@
+"""Compare profile feed queries before and after `get_author_posts`.
+
+`get_all_for_user(user).filter(author=...)` puts visibility check and
+authorship into one OR clause, while `get_author_posts` picks a single
+branch depending on who is looking at the profile.
+
+Usage:
+    python -m benchmarks.author_posts --posts 1000000
+"""
+
+import argparse
+import random
+from datetime import timedelta
+
+from benchmarks.utils import batched, format_stats, measure, setup_django
+
+AUTHORS = 1000
+CATEGORIES = 20
+PAGE_SIZE = 10
+
+
+def populate(total_posts: int) -> None:
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from blog.models import Category, Post
+
+    user_model = get_user_model()
+    if Post.objects.count() >= total_posts:
+        return
+
+    authors = user_model.objects.bulk_create(
+        user_model(username=f'author_{i}') for i in range(AUTHORS)
+    )
+    categories = Category.objects.bulk_create(
+        Category(
+            title=f'Category {i}',
+            slug=f'category-{i}',
+            description='',
+            is_published=i % 10 != 0,
+        )
+        for i in range(CATEGORIES)
+    )
+    # Few authors write most of the posts.
+    weights = [1 / (rank + 1) for rank in range(AUTHORS)]
+    now = timezone.now()
+
+    def make_post(i: int) -> Post:
+        pub_date = now + timedelta(minutes=random.randint(-(10**6), 10**4))
+        return Post(
+            title=f'Post {i}',
+            text='Text',
+            pub_date=pub_date,
+            is_released=pub_date <= now,
+            is_published=random.random() > 0.05,
+            author=random.choices(authors, weights)[0],
+            category=random.choice(categories),
+        )
+
+    posts = (make_post(i) for i in range(total_posts))
+    for batch in batched(posts, 10_000):
+        Post.objects.bulk_create(batch)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django('bench_author_posts.sqlite3')
+
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.base_user import AbstractBaseUser
+
+    from blog.models import Post
+
+    populate(args.posts)
+
+    user_model = get_user_model()
+    owner = user_model.objects.get(username='author_0')
+    visitor = user_model.objects.get(username='author_1')
+
+    def old_version(viewer: AbstractBaseUser) -> None:
+        queryset = (
+            Post.objects.select_all_related()
+            .get_all_for_user(viewer)
+            .filter(author__username=owner.username)
+        )
+        queryset.count()
+        list(queryset[:PAGE_SIZE])
+
+    def new_version(viewer: AbstractBaseUser) -> None:
+        queryset = Post.objects.select_all_related().get_author_posts(
+            owner, viewer
+        )
+        queryset.count()
+        list(queryset[:PAGE_SIZE])
+
+    print(f'{Post.objects.count()} posts, {owner.posts.count()} by owner')
+    for viewer_name, viewer in (('owner', owner), ('visitor', visitor)):
+        for name, func in (
+            ('get_all_for_user', old_version),
+            ('get_author_posts', new_version),
+        ):
+            stats = measure(lambda f=func, v=viewer: f(v), args.repeat)
+            print(format_stats(f'{name} ({viewer_name})', stats))
+
+
+if __name__ == '__main__':
+    main()
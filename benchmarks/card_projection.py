@@ -0,0 +1,87 @@
+"""Compare feed queries loading whole rows and card projections.
+
+`select_all_related()` reads every column of posts, their authors,
+categories and locations, while `for_cards()` reads only the columns
+shown on feed cards, with the stored excerpt instead of the text. Shows size of
+fetched values, memory taken by model instances and query time.
+
+Uses the data of `benchmarks.views` at the same scale.
+
+Usage:
+    python -m benchmarks.card_projection --scale 0.1 --posts 1000
+"""
+
+import argparse
+import tracemalloc
+from typing import TYPE_CHECKING
+
+from benchmarks.utils import format_stats, measure, setup_django
+from benchmarks.views import populate
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+
+
+def value_size(value: object) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, bytes):
+        return len(value)
+    return 8
+
+
+def fetched_bytes(queryset: 'QuerySet') -> int:
+    """Return total size of values in rows of the query."""
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return sum(value_size(value) for row in cursor for value in row)
+
+
+def peak_memory(queryset: 'QuerySet') -> int:
+    """Return peak memory allocated while loading model instances."""
+    tracemalloc.start()
+    posts = list(queryset)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del posts
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument(
+        '--posts', type=int, default=1000, help='Posts loaded at once.'
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django(f'bench_views_{args.scale:g}.sqlite3')
+    populate(args.scale)
+
+    from blog.models import Post
+
+    querysets = {
+        'select_all_related': Post.objects.select_all_related(),
+        'for_cards': Post.objects.for_cards(),
+    }
+    print(f'{Post.objects.count()} posts, loading {args.posts} of them')
+    for name, queryset in querysets.items():
+        queryset = queryset.get_published()[: args.posts]
+        size = fetched_bytes(queryset)
+        memory = peak_memory(queryset)
+        stats = measure(lambda q=queryset: list(q.all()), args.repeat)
+        print(
+            f'{name:<20} fetched {size / 1024:9.1f} KiB  '
+            f'memory {memory / 1024:9.1f} KiB'
+        )
+        print(format_stats(f'{name} query', stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Helpers shared by benchmark scripts.
+
+Benchmarks are run from the project root as modules, for example
+`python -m benchmarks.author_posts`. Each of them works with its own
+SQLite database in this directory, so data is generated only once.
+"""
+
+import os
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+
+import django
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BASE_DIR = BENCHMARKS_DIR.parent
+
+
+def setup_django(database: str) -> None:
+    """Set up Django with a migrated benchmark database.
+
+    Args:
+        database: File name of SQLite database inside benchmarks directory.
+    """
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    django.setup()
+
+    from django.db import connection
+
+    connection.settings_dict['TEST']['NAME'] = str(BENCHMARKS_DIR / database)
+    connection.creation.create_test_db(
+        verbosity=0, keepdb=True, serialize=False
+    )
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Split iterable into lists of `size` items."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict[str, float]:
+    """Call function `repeat` times and return latency stats in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'mean': statistics.fmean(timings),
+        'p50': percentile(timings, 0.5),
+        'p95': percentile(timings, 0.95),
+    }
+
+
+def percentile(values: Iterable[float], fraction: float) -> float:
+    """Return value below which `fraction` of values lie."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def format_stats(name: str, stats: dict[str, float]) -> str:
+    values = '  '.join(f'{key}={value:8.2f}ms' for key, value in stats.items())
+    return f'{name:<40} {values}'
@@ -0,0 +1,245 @@
+"""Measure blog pages on synthetic data of production scale.
+
+Data is created by `generate_data` command once per scale, in its own
+database. Every page is requested through the whole middleware stack,
+by default with an empty cache. Latency percentiles come from the wall
+clock, SQL time and query count from `Server-Timing` header.
+
+Results can be saved as a named baseline, and later runs compared with
+it. A run fails when a page issues more queries than in the baseline or
+its p95 latency grows beyond the tolerance.
+
+Usage:
+    python -m benchmarks.views --scale 0.01 --save-baseline main
+    python -m benchmarks.views --scale 0.01 --compare main
+    python -m benchmarks.views --scale 0.01 --feed-entries --compare main
+    python -m benchmarks.views  # 100k users, 1M posts, 10M comments
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+
+from benchmarks.utils import BENCHMARKS_DIR, percentile, setup_django
+
+BASELINES_DIR = BENCHMARKS_DIR / 'baselines'
+# Data size at scale 1.
+USERS = 100_000
+POSTS = 1_000_000
+COMMENTS = 10_000_000
+
+
+def populate(scale: float) -> None:
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from blog.fake_data import USERNAME_PREFIX
+
+    if (
+        get_user_model()
+        .objects.filter(username=f'{USERNAME_PREFIX}0')
+        .exists()
+    ):
+        return
+    call_command(
+        'generate_data',
+        users=math.ceil(USERS * scale),
+        posts=math.ceil(POSTS * scale),
+        comments=math.ceil(COMMENTS * scale),
+    )
+
+
+def populate_feeds() -> None:
+    from blog.feeds import rebuild_feeds
+    from blog.models import FeedEntry
+
+    if not FeedEntry.objects.exists():
+        rebuild_feeds()
+
+
+def get_pages() -> dict[str, tuple[str, str | None]]:
+    """Return url of each measured page and username to request it as."""
+    from django.urls import reverse
+
+    from blog.constants import COMMENTS_ON_PAGE
+    from blog.fake_data import CATEGORY_SLUG_PREFIX, USERNAME_PREFIX
+    from blog.models import Post
+
+    hot_author = f'{USERNAME_PREFIX}0'
+    profile_url = reverse('blog:profile', args=(hot_author,))
+    thread = Post.objects.get_published().order_by('-comment_count').first()
+    thread_url = reverse('blog:post_detail', args=(thread.pk,))
+    last_comments = math.ceil(thread.comment_count / COMMENTS_ON_PAGE)
+    return {
+        'index': (reverse('blog:index'), None),
+        'index, last page': (reverse('blog:index') + '?page=last', None),
+        'category': (
+            reverse('blog:category_posts', args=(f'{CATEGORY_SLUG_PREFIX}0',)),
+            None,
+        ),
+        'profile, visitor': (profile_url, None),
+        'profile, owner': (profile_url, hot_author),
+        'post, longest thread': (thread_url, None),
+        'post, last comments': (
+            f'{thread_url}?comments_page={last_comments}',
+            None,
+        ),
+        'search': (reverse('blog:search') + '?q=горы озеро', None),
+    }
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    """Return SQL time and query count from `Server-Timing` header."""
+    metrics = {}
+    for item in header.split(','):
+        name, *params = item.strip().split(';')
+        for param in params:
+            key, value = param.split('=', 1)
+            if key == 'dur':
+                metrics[name] = float(value)
+            elif key == 'desc' and name == 'db':
+                metrics['queries'] = int(value.strip('"').split()[0])
+    return {'db': metrics['db'], 'queries': metrics['queries']}
+
+
+def measure_page(
+    url: str, username: str | None, repeat: int, warm: bool
+) -> dict[str, float]:
+    """Request page `repeat` times and return latency stats in ms."""
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.test import Client
+
+    client = Client(HTTP_HOST='localhost')
+    if username is not None:
+        client.force_login(get_user_model().objects.get(username=username))
+
+    client.get(url)  # Compile templates and open connection.
+    timings, db_timings, queries = [], [], []
+    for _ in range(repeat):
+        if not warm:
+            cache.clear()
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} responded with {response.status_code}')
+        metrics = parse_server_timing(response['Server-Timing'])
+        db_timings.append(metrics['db'])
+        queries.append(metrics['queries'])
+
+    return {
+        'p50': percentile(timings, 0.5),
+        'p95': percentile(timings, 0.95),
+        'p99': percentile(timings, 0.99),
+        'db': statistics.fmean(db_timings),
+        'queries': max(queries),
+    }
+
+
+def format_row(name: str, stats: dict[str, float], note: str = '') -> str:
+    return (
+        f'{name:<24} p50={stats["p50"]:8.2f}ms  p95={stats["p95"]:8.2f}ms  '
+        f'p99={stats["p99"]:8.2f}ms  db={stats["db"]:8.2f}ms  '
+        f'queries={stats["queries"]:3}  {note}'
+    )
+
+
+def compare(
+    stats: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> tuple[str, bool]:
+    """Describe change against baseline and tell if it is a regression."""
+    change = (stats['p95'] - baseline['p95']) / baseline['p95']
+    note = f'p95 {change:+.0%}'
+    if stats['queries'] != baseline['queries']:
+        note += f', queries {baseline["queries"]} -> {stats["queries"]}'
+    regressed = stats['queries'] > baseline['queries'] or change > tolerance
+    return note + (' REGRESSION' if regressed else ''), regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--scale', type=float, default=1.0, help='Share of production data.'
+    )
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument(
+        '--warm', action='store_true', help='Keep cache between requests.'
+    )
+    parser.add_argument(
+        '--feed-entries',
+        action='store_true',
+        help='Read feeds from materialized FeedEntry table.',
+    )
+    parser.add_argument('--save-baseline', metavar='NAME')
+    parser.add_argument('--compare', metavar='NAME')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.2,
+        help='Allowed relative growth of p95 against baseline.',
+    )
+    args = parser.parse_args()
+
+    setup_django(f'bench_views_{args.scale:g}.sqlite3')
+
+    from django.conf import settings
+    from django.test.utils import override_settings
+
+    populate(args.scale)
+    # Debug toolbar would render its panel into every page.
+    override_settings(
+        MIDDLEWARE=[
+            name for name in settings.MIDDLEWARE if 'debug_toolbar' not in name
+        ],
+        BLOG_FEED_ENTRIES=args.feed_entries,
+    ).enable()
+    if args.feed_entries:
+        populate_feeds()
+
+    cache_mode = 'warm' if args.warm else 'cold'
+    baseline = {}
+    if args.compare:
+        path = BASELINES_DIR / f'{args.compare}.json'
+        saved = json.loads(path.read_text())
+        if (saved['scale'], saved['cache']) != (args.scale, cache_mode):
+            sys.exit(
+                f'Baseline {args.compare} was measured at scale '
+                f'{saved["scale"]:g} with {saved["cache"]} cache.'
+            )
+        baseline = saved['pages']
+
+    print(
+        f'scale {args.scale:g}, {cache_mode} cache, {args.repeat} requests'
+        + (', feed entries' if args.feed_entries else '')
+    )
+    results = {}
+    regressions = 0
+    for name, (url, username) in get_pages().items():
+        stats = measure_page(url, username, args.repeat, args.warm)
+        results[name] = stats
+        note = ''
+        if name in baseline:
+            note, regressed = compare(stats, baseline[name], args.tolerance)
+            regressions += regressed
+        print(format_row(name, stats, note))
+
+    if args.save_baseline:
+        BASELINES_DIR.mkdir(exist_ok=True)
+        path = BASELINES_DIR / f'{args.save_baseline}.json'
+        path.write_text(
+            json.dumps(
+                {'scale': args.scale, 'cache': cache_mode, 'pages': results},
+                indent=2,
+            )
+        )
+        print(f'Saved baseline to {path}')
+    if regressions:
+        sys.exit(f'{regressions} pages regressed against {args.compare}.')
+
+
+if __name__ == '__main__':
+    main()
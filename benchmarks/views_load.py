@@ -0,0 +1,226 @@
+"""Compare throughput of read-only blog pages under WSGI and ASGI.
+
+Requests are fed straight into Django's WSGI and ASGI handlers, without
+a web server in between, so the numbers show the cost of Django itself.
+Under WSGI concurrent requests are served by a thread pool with sync
+views, under ASGI by tasks of one event loop, either with the same sync
+views (`asgi`) or with `blog.async_views` (`asgi-async`). Views are
+picked when urls are imported, so each run is measured in its own
+process.
+
+Debug toolbar middleware is sync-only and would push every ASGI request
+through the thread executor, so it is left out, as in production.
+
+Usage:
+    python -m benchmarks.views_load --requests 2000 --concurrency 20
+    python -m benchmarks.views_load --cold  # without any caching
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from benchmarks.utils import setup_django
+
+SERVERS = ('wsgi', 'asgi', 'asgi-async')
+CLIENT_ADDR = '10.0.0.1'
+
+
+def wsgi_environ(url: str) -> dict:
+    path, _, query = url.partition('?')
+    return {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'REMOTE_ADDR': CLIENT_ADDR,
+        'wsgi.input': io.BytesIO(),
+        'wsgi.url_scheme': 'http',
+    }
+
+
+def asgi_scope(url: str) -> dict:
+    path, _, query = url.partition('?')
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': (CLIENT_ADDR, 50000),
+        'server': ('localhost', 80),
+    }
+
+
+def run_wsgi(paths: list[str], concurrency: int) -> list[float]:
+    """Serve requests to `paths` and return their latencies in ms."""
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+
+    def request(path: str) -> float:
+        statuses = []
+        start = time.perf_counter()
+        response = handler(
+            wsgi_environ(path),
+            lambda status, headers: statuses.append(status),
+        )
+        b''.join(response)
+        response.close()
+        elapsed = (time.perf_counter() - start) * 1000
+        if not statuses[0].startswith('200'):
+            raise RuntimeError(f'{path} responded with {statuses[0]}')
+        return elapsed
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        return list(executor.map(request, paths))
+
+
+async def run_asgi(paths: list[str], concurrency: int) -> list[float]:
+    """Serve requests to `paths` and return their latencies in ms."""
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(path: str) -> float:
+        messages = []
+        disconnected = asyncio.Event()
+        body_sent = False
+
+        async def receive() -> dict:
+            nonlocal body_sent
+            if body_sent:
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message: dict) -> None:  # noqa: RUF029
+            messages.append(message)
+
+        async with semaphore:
+            start = time.perf_counter()
+            await handler(asgi_scope(path), receive, send)
+            elapsed = (time.perf_counter() - start) * 1000
+        disconnected.set()
+        if messages[0]['status'] != 200:
+            raise RuntimeError(f'{path} responded with {messages[0]}')
+        return elapsed
+
+    return await asyncio.gather(*map(request, paths))
+
+
+def get_paths() -> list[str]:
+    from django.urls import reverse
+
+    from blog.models import Post
+
+    post = Post.objects.get_published().select_related('category').first()
+    return [
+        reverse('blog:index'),
+        reverse('blog:index') + '?page=2',
+        reverse('blog:category_posts', args=(post.category.slug,)),
+        reverse('blog:profile', args=(post.author.username,)),
+        reverse('blog:post_detail', args=(post.pk,)),
+    ]
+
+
+def measure_server(args: argparse.Namespace) -> None:
+    os.environ['BLOG_ASYNC_VIEWS'] = (
+        '1' if args.server == 'asgi-async' else '0'
+    )
+    setup_django('bench_author_posts.sqlite3')
+
+    from django.conf import settings
+    from django.test.utils import override_settings
+
+    from benchmarks.author_posts import populate
+    from blog.scheduling import release_due_posts
+
+    populate(args.posts)
+
+    overrides = {
+        'MIDDLEWARE': [
+            name for name in settings.MIDDLEWARE if 'debug_toolbar' not in name
+        ],
+    }
+    if args.cold:
+        overrides['CACHES'] = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+            }
+        }
+    override_settings(**overrides).enable()
+
+    paths = get_paths()
+    requests = list(islice(cycle(paths), args.requests))
+
+    def run() -> list[float]:
+        # Posts are scheduled about every minute, and pages are not cached
+        # while a due post waits for run_worker.
+        release_due_posts()
+        if args.server.startswith('asgi'):
+            return asyncio.run(run_asgi(requests, args.concurrency))
+        return run_wsgi(requests, args.concurrency)
+
+    run()  # Warm up connections, templates and caches.
+    start = time.perf_counter()
+    timings = sorted(run())
+    elapsed = time.perf_counter() - start
+
+    print(
+        f'{args.server:<10} {len(timings) / elapsed:8.1f} req/s  '
+        f'p50={timings[len(timings) // 2]:8.2f}ms  '
+        f'p95={timings[int(len(timings) * 0.95)]:8.2f}ms'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--server', choices=SERVERS)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--cold', action='store_true')
+    args = parser.parse_args()
+
+    if args.server is not None:
+        measure_server(args)
+        return
+
+    print(
+        f'{args.requests} requests, concurrency {args.concurrency}, '
+        f'{"cold" if args.cold else "warm"} cache'
+    )
+    for server in SERVERS:
+        subprocess.run(
+            [
+                sys.executable,
+                '-m',
+                'benchmarks.views_load',
+                '--server',
+                server,
+                *sys.argv[1:],
+            ],
+            check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
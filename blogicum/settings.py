@@ -1,3 +1,4 @@
+import os
 import sys
 from pathlib import Path
 
@@ -10,6 +11,8 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+# Scheme and host of the site for links in emails.
+SITE_URL = os.environ.get('DJANGO_SITE_URL', 'http://127.0.0.1:8000')
 
 sys.path.insert(0, str(APPS_PATH))
 
@@ -51,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,7 +74,7 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.templating.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -84,6 +88,9 @@ TEMPLATES = [
     },
 ]
 
+# Compile all templates from `DIRS` on startup.
+TEMPLATES_WARMUP = False
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
@@ -94,6 +101,9 @@ DATABASES = {
     }
 }
 
+# PRAGMA statements executed on every new SQLite connection.
+SQLITE_PRAGMAS: dict[str, str | int] = {}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -122,4 +132,17 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Use keyset pagination (?after=/?before=) in post feeds.
+# Avoids COUNT(*) and OFFSET queries, but hides page numbers.
+BLOG_CURSOR_PAGINATION = False
+
+# Route read-only blog pages to async views from `blog.async_views`.
+# Off by default: on Django 4.2 sync views are faster under ASGI too,
+# see `benchmarks.views_load`.
+BLOG_ASYNC_VIEWS = os.environ.get('BLOG_ASYNC_VIEWS') == '1'
+
+# Read category feeds and visitors' author feeds from `FeedEntry` table,
+# kept by signals and `run_worker`. Run `rebuild_feeds` after enabling.
+BLOG_FEED_ENTRIES = False
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -0,0 +1,117 @@
+"""Settings for production deployment.
+
+Selected with `DJANGO_SETTINGS_MODULE=blogicum.settings_production`.
+Requires `DJANGO_SECRET_KEY` and `DJANGO_ALLOWED_HOSTS` (comma-separated)
+environment variables. Links in emails lead to the first allowed host
+unless `DJANGO_SITE_URL` is set.
+
+Cached cards, pages and feed counts are invalidated by bumping version
+stamps in the cache, so every web worker and `run_worker` process must
+share one cache backend. It is Redis at `DJANGO_REDIS_URL`. Setting
+`DJANGO_CACHE_DIR` instead switches to a directory on the local disk,
+a fallback for a single host without Redis.
+"""
+
+import os
+
+from blogicum.settings import *
+from blogicum.settings import (
+    BASE_DIR,
+    DATABASES,
+    INSTALLED_APPS,
+    MIDDLEWARE,
+    TEMPLATES,
+)
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = os.environ['DJANGO_ALLOWED_HOSTS'].split(',')
+
+SITE_URL = os.environ.get('DJANGO_SITE_URL', f'https://{ALLOWED_HOSTS[0]}')
+
+# Debug toolbar instruments every query and template render.
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'debug_toolbar']
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if not middleware.startswith('debug_toolbar.')
+]
+# Serve static files before any other middleware touches the request.
+MIDDLEWARE.insert(
+    MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+    'core.middleware.StaticFilesMiddleware',
+)
+
+# Hashed file names with brotli and gzip variants, see core.storage.
+STATIC_ROOT = BASE_DIR / 'static'
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Keep compiled templates in memory, filling the cache on startup.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                (
+                    'django.template.loaders.cached.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ],
+                ),
+            ],
+        },
+    }
+]
+TEMPLATES_WARMUP = True
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Shared by all processes, unlike the default per-process LocMemCache,
+# so writes in one of them purge caches of the others. Version stamps
+# are read on every render and bumped with atomic INCR.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get(
+            'DJANGO_REDIS_URL', 'redis://127.0.0.1:6379/0'
+        ),
+    }
+}
+if 'DJANGO_CACHE_DIR' in os.environ:
+    # Every set() lists the whole directory to cull it, and incr() is
+    # a get followed by a set, so concurrent bumps may be lost.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['DJANGO_CACHE_DIR'],
+            'OPTIONS': {'MAX_ENTRIES': 50_000},
+        }
+    }
+
+# WAL lets readers work while a writer commits, NORMAL sync is safe in
+# WAL mode. Writers wait for the lock instead of failing at once.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # In KiB.
+    'busy_timeout': 5000,  # In ms.
+}
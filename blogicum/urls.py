@@ -3,7 +3,7 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
-from core.views import Registration
+from core.views import Registration, ServerTimings
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_failure'
@@ -16,6 +16,11 @@ urlpatterns = [
         Registration.as_view(),
         name='registration',
     ),
+    path(
+        'admin/server-timings/',
+        ServerTimings.as_view(),
+        name='server_timings',
+    ),
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls')),
 ]
@@ -1,9 +1,13 @@
+from collections.abc import Callable
 from datetime import timedelta
 from random import randint
 
 import pytest
 from django.contrib.auth.base_user import AbstractBaseUser
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -14,6 +18,33 @@ DAY_SPREAD = 50
 COMMENT_COUNT = 15
 
 
+@pytest.fixture(autouse=True)
+def clear_cache() -> None:
+    cache.clear()
+
+
+@pytest.fixture
+def assert_query_budget() -> Callable[[Client, str, int], None]:
+    """Request page and fail listing SQL if it runs too many queries."""
+
+    def check(client: Client, url: str, budget: int) -> None:
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        queries = context.captured_queries
+        if len(queries) > budget:
+            sql = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(queries, start=1)
+            )
+            pytest.fail(
+                f'{url} ran {len(queries)} queries, budget is {budget}:'
+                f'\n{sql}',
+                pytrace=False,
+            )
+
+    return check
+
+
 def _create_client(user: AbstractBaseUser) -> Client:
     client = Client()
     client.force_login(user)
@@ -123,6 +154,11 @@ def index_url() -> str:
     return reverse('blog:index')
 
 
+@pytest.fixture
+def search_url() -> str:
+    return reverse('blog:search')
+
+
 @pytest.fixture
 def rules_url() -> str:
     return reverse('pages:rules')
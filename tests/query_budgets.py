@@ -0,0 +1,24 @@
+"""Maximum count of SQL queries each page may run.
+
+Budgets don't depend on the amount of data, so a query issued per post
+or per comment shows up as a breach. Pages are requested with an empty
+cache, both by an anonymous user and by the author of the content.
+"""
+
+QUERY_BUDGETS: dict[str, tuple[int, int]] = {
+    # URL name: (anonymous, author)
+    'blog:index': (3, 5),
+    'blog:search': (2, 4),
+    'blog:category_posts': (4, 6),
+    'blog:profile': (4, 6),
+    'blog:edit_profile': (0, 2),
+    'blog:post_detail': (2, 4),
+    'blog:create_post': (0, 4),
+    'blog:edit_post': (0, 5),
+    'blog:delete_post': (0, 3),
+    'blog:add_comment': (0, 3),
+    'blog:edit_comment': (0, 3),
+    'blog:delete_comment': (0, 3),
+    'pages:about': (0, 2),
+    'pages:rules': (0, 2),
+}
@@ -1,8 +1,27 @@
+import base64
+import re
+from datetime import timedelta
+
 import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.http import Http404
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
 from pytest_lazyfixture import lazy_fixture as lf
 
-from blog.constants import POSTS_ON_PAGE
+from blog import async_views
+from blog.cache import post_card_stats
+from blog.constants import COMMENTS_ON_PAGE, POSTS_ON_PAGE
+from blog.feeds import rebuild_feeds
 from blog.forms import CommentForm, PostForm, ProfileForm
+from blog.models import Comment, Post
+from core.models import Task
+from core.queue import work
 
 
 @pytest.mark.usefixtures('create_many_posts')
@@ -99,3 +118,454 @@ post_contain_params = (
 def test_contains_post(param_post, url, param_client, does_show):
     response = param_client.get(url)
     assert (param_post in response.context['object_list']) is does_show
+
+
+@pytest.mark.usefixtures('create_many_posts')
+@pytest.mark.parametrize(
+    'url',
+    (
+        lf('index_url'),
+        lf('category_url'),
+        lf('a_profile_url'),
+    ),
+)
+def test_cursor_pagination(client, settings, url):
+    settings.BLOG_CURSOR_PAGINATION = True
+
+    first_page = client.get(url).context['page_obj']
+    assert len(first_page) == POSTS_ON_PAGE
+    assert first_page.has_next() and not first_page.has_previous()
+
+    response = client.get(url, {'after': first_page.next_cursor})
+    second_page = response.context['page_obj']
+    assert len(second_page) == 1
+    assert not second_page.has_next() and second_page.has_previous()
+
+    response = client.get(url, {'before': second_page.previous_cursor})
+    back_page = response.context['page_obj']
+    assert list(back_page) == list(first_page)
+
+
+@pytest.mark.usefixtures(
+    'create_many_posts', 'unpublished_post', 'delayed_post', 'unpub_cat_post'
+)
+@pytest.mark.parametrize('cursor_pagination', (False, True))
+@pytest.mark.parametrize(
+    'url, param_client',
+    (
+        (lf('category_url'), lf('client')),
+        (lf('a_profile_url'), lf('user_client')),
+        (lf('a_profile_url'), lf('author_client')),
+    ),
+)
+def test_feed_entries_list_same_posts(
+    settings, url, param_client, cursor_pagination
+):
+    settings.BLOG_CURSOR_PAGINATION = cursor_pagination
+
+    def get_feed() -> list[Post]:
+        cache.clear()
+        first_page = param_client.get(url).context['page_obj']
+        params = (
+            {'after': first_page.next_cursor}
+            if cursor_pagination
+            else {'page': 2}
+        )
+        second_page = param_client.get(url, params).context['page_obj']
+        return [*first_page, *second_page]
+
+    expected = get_feed()
+    settings.BLOG_FEED_ENTRIES = True
+    rebuild_feeds()
+    feed = get_feed()
+    # Page-number feeds order posts of the same date arbitrarily.
+    assert set(feed) == set(expected)
+    assert [post.pub_date for post in feed] == [
+        post.pub_date for post in expected
+    ]
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    (
+        'garbage',
+        *(
+            base64.urlsafe_b64encode(raw.encode()).decode()
+            for raw in (
+                '2020-01-01T00:00:00+00:00|99999999999999999999',
+                '2020-01-01T00:00:00+00:00|-1',
+                '2020-01-01T00:00:00|1',
+                '2020-01-01T00:00:00+00:00|1|2',
+            )
+        ),
+    ),
+)
+def test_cursor_pagination_rejects_bad_cursor(
+    client, settings, index_url, cursor
+):
+    settings.BLOG_CURSOR_PAGINATION = True
+    assert client.get(index_url, {'after': cursor}).status_code == 404
+
+
+@pytest.mark.usefixtures(
+    'post', 'unpublished_post', 'delayed_post', 'unpub_cat_post'
+)
+@pytest.mark.parametrize('viewer', (lf('author'), lf('user'), None))
+def test_author_posts_match_all_for_user(author, viewer):
+    viewer = viewer or AnonymousUser()
+    assert set(Post.objects.get_author_posts(author, viewer)) == set(
+        Post.objects.get_all_for_user(viewer).filter(author=author)
+    )
+
+
+def test_post_card_cache(user_client, post, index_url, category):
+    post_card_stats.reset()
+
+    user_client.get(index_url)
+    user_client.get(index_url)
+    assert (post_card_stats.misses, post_card_stats.hits) == (1, 1)
+
+    category.title = 'Renamed category'
+    category.save()
+    response = user_client.get(index_url)
+    assert post_card_stats.misses == 2
+    assert 'Renamed category' in response.content.decode()
+
+
+def test_feed_cards_load_only_shown_columns(post, index_url, client):
+    post.text = ' '.join(['слово'] * 200)
+    post.save()
+
+    card = Post.objects.for_cards().get(pk=post.pk)
+
+    assert {'text', 'created_at'} <= card.get_deferred_fields()
+    assert 'password' in card.author.get_deferred_fields()
+    assert 'description' in card.category.get_deferred_fields()
+    assert card.excerpt == ' '.join(['слово'] * 10) + ' …'
+    assert card.excerpt in client.get(index_url).content.decode()
+
+
+def test_excerpt_follows_text(post):
+    post.text = 'Новый текст'
+    post.save()
+
+    post.refresh_from_db()
+    assert post.excerpt == 'Новый текст'
+
+
+@pytest.mark.parametrize(
+    'url',
+    (
+        lf('index_url'),
+        lf('category_url'),
+        lf('a_profile_url'),
+        lf('post_detail_url'),
+    ),
+)
+def test_anonymous_page_cache(client, post, url):
+    assert post.title in client.get(url).content.decode()
+
+    Post.objects.filter(pk=post.pk).update(title='Changed silently')
+    assert 'Changed silently' not in client.get(url).content.decode()
+
+    post.title = 'Changed with save'
+    post.save()
+    assert 'Changed with save' in client.get(url).content.decode()
+
+
+def test_page_cache_ignores_unread_query_params(client, post, post_detail_url):
+    client.get(post_detail_url)
+    Post.objects.filter(pk=post.pk).update(title='Changed silently')
+
+    response = client.get(post_detail_url, {'utm_source': 'mail'})
+    assert 'Changed silently' not in response.content.decode()
+    response = client.get(post_detail_url, {'comments_page': 1})
+    assert 'Changed silently' in response.content.decode()
+
+
+def test_user_saves_purge_only_pages_showing_them(
+    client, django_user_model, author, post, index_url, a_profile_url
+):
+    client.get(index_url)
+    client.get(a_profile_url)
+    Post.objects.filter(pk=post.pk).update(title='Changed silently')
+
+    django_user_model.objects.create(username='newcomer')
+    author.first_name = 'Renamed'
+    author.save()
+    assert 'Changed silently' not in client.get(index_url).content.decode()
+    assert 'Renamed' in client.get(a_profile_url).content.decode()
+
+    author.username = 'renamed_author'
+    author.save()
+    assert 'Changed silently' in client.get(index_url).content.decode()
+
+
+def test_moved_post_purges_pages_of_both_authors(
+    client, post, user, a_profile_url
+):
+    u_profile_url = reverse('blog:profile', args=(user.username,))
+    assert post.title in client.get(a_profile_url).content.decode()
+    assert post.title not in client.get(u_profile_url).content.decode()
+
+    post.author = user
+    post.save()
+
+    assert post.title not in client.get(a_profile_url).content.decode()
+    assert post.title in client.get(u_profile_url).content.decode()
+
+
+def test_page_cache_expires_with_scheduled_post(
+    client, monkeypatch, post, delayed_post, index_url
+):
+    timeouts = {}
+    monkeypatch.setattr(
+        'blog.mixins.cache.set',
+        lambda key, value, timeout: timeouts.update({key: timeout}),
+    )
+    delayed_post.pub_date = timezone.now() + timedelta(seconds=30)
+    delayed_post.save()
+
+    client.get(index_url)
+
+    [page_timeout] = (
+        timeout for key, timeout in timeouts.items() if ':page:' in key
+    )
+    [count_timeout] = (
+        timeout for key, timeout in timeouts.items() if ':count:' in key
+    )
+    assert 0 < page_timeout <= 30
+    assert 0 < count_timeout <= 30
+
+
+def test_page_cache_is_purged_by_release(client, delayed_post, index_url):
+    assert delayed_post.title not in client.get(index_url).content.decode()
+
+    Post.objects.filter(pk=delayed_post.pk).update(pub_date=timezone.now())
+    Task.objects.update(run_after=timezone.now())
+    work(threads=1, burst=True)
+
+    assert delayed_post.title in client.get(index_url).content.decode()
+
+
+@pytest.mark.usefixtures('create_many_posts')
+def test_feed_post_count_is_cached(user_client, author, index_url):
+    def count_queries() -> int:
+        with CaptureQueriesContext(connection) as context:
+            user_client.get(index_url)
+        return sum(
+            'COUNT(*)' in query['sql'] for query in context.captured_queries
+        )
+
+    assert count_queries() == 1
+    assert count_queries() == 0
+
+    Post.objects.create(
+        title='New post',
+        text='Text',
+        pub_date=timezone.now(),
+        author=author,
+    )
+    assert count_queries() == 1
+
+
+def test_paginator_renders_page_window(user_client, post, index_url):
+    Post.objects.bulk_create(
+        Post(
+            title=f'Title {i}',
+            text='Text',
+            pub_date=post.pub_date,
+            is_released=True,
+            author=post.author,
+            category=post.category,
+        )
+        for i in range(POSTS_ON_PAGE * 20)
+    )
+
+    page_obj = user_client.get(index_url, {'page': 10}).context['page_obj']
+
+    ellipsis = Paginator.ELLIPSIS
+    assert page_obj.page_window == [1, ellipsis, *range(8, 13), ellipsis, 21]
+
+
+def test_detail_shows_only_published_comments(
+    client, comment, post_detail_url
+):
+    hidden_comment = Comment.objects.create(
+        text='Hidden', author=comment.author, post=comment.post
+    )
+    hidden_comment.is_published = False
+    hidden_comment.save()
+
+    comments = client.get(post_detail_url).context['comments']
+
+    assert list(comments) == [comment]
+
+
+def test_detail_paginates_comments(client, post, author, post_detail_url):
+    for i in range(COMMENTS_ON_PAGE + 1):
+        Comment.objects.create(text=f'Comment {i}', author=author, post=post)
+
+    first_page = client.get(post_detail_url).context['comments']
+    response = client.get(post_detail_url, {'comments_page': 2})
+    last_page = response.context['comments']
+
+    assert len(first_page) == COMMENTS_ON_PAGE
+    assert first_page.has_next()
+    assert [comment.text for comment in last_page] == [
+        f'Comment {COMMENTS_ON_PAGE}'
+    ]
+
+
+@pytest.mark.usefixtures('unpublished_post', 'delayed_post')
+def test_search_finds_only_published_posts(client, post, search_url):
+    post.title = 'Unpublished delayed title'
+    post.save()
+
+    response = client.get(search_url, {'q': 'title'})
+
+    assert list(response.context['object_list']) == [post]
+
+
+def test_search_renders_page_numbers(client, post, search_url):
+    Post.objects.bulk_create(
+        Post(
+            title=f'Title {i}',
+            text='Text',
+            pub_date=post.pub_date,
+            is_released=True,
+            author=post.author,
+            category=post.category,
+        )
+        for i in range(POSTS_ON_PAGE * 2)
+    )
+
+    content = client.get(search_url, {'q': 'title', 'page': 2}).content
+    page_numbers = re.findall(
+        r'class="page-link"[^>]*>(\d+)<', content.decode()
+    )
+    assert page_numbers == ['1', '2', '3']
+
+
+def test_search_ranks_title_matches_first(author, category):
+    pub_date = timezone.now() - timedelta(days=1)
+    in_text = Post.objects.create(
+        title='Заметка',
+        text='Поход в горы',
+        pub_date=pub_date,
+        author=author,
+        category=category,
+    )
+    in_title = Post.objects.create(
+        title='Горы Алтая',
+        text='Поход',
+        pub_date=pub_date - timedelta(days=1),
+        author=author,
+        category=category,
+    )
+
+    assert list(Post.objects.search('гор')) == [in_title, in_text]
+    assert list(Post.objects.search('поход алта')) == [in_title]
+    assert not Post.objects.search('"*) OR (').exists()
+
+
+def test_search_index_follows_post_changes(post):
+    post.title = 'Renamed'
+    post.save()
+
+    assert list(Post.objects.search('renamed')) == [post]
+    assert not Post.objects.search('title').exists()
+
+    post.delete()
+
+    assert not Post.objects.search('renamed').exists()
+
+
+def get_async(rf, url, user=None, **params):
+    """Call async counterpart of the view serving `url`."""
+    match = resolve(url)
+    view = getattr(async_views, match.func.view_class.__name__)
+    request = rf.get(url, params)
+    request.user = user or AnonymousUser()
+    return async_to_sync(view.as_view())(request, **match.kwargs)
+
+
+def without_csrf_token(content: bytes) -> str:
+    return re.sub(r'value="\w{64}"', '', content.decode())
+
+
+@pytest.mark.usefixtures('create_many_posts', 'comment')
+@pytest.mark.parametrize(
+    'url',
+    (
+        lf('index_url'),
+        lf('category_url'),
+        lf('a_profile_url'),
+        lf('post_detail_url'),
+    ),
+)
+@pytest.mark.parametrize('page', ('1', '2', 'last'))
+@pytest.mark.parametrize('logged_in', (False, True))
+@pytest.mark.parametrize('feed_entries', (False, True))
+def test_async_views_render_same_page(
+    client,
+    author_client,
+    rf,
+    settings,
+    author,
+    url,
+    page,
+    logged_in,
+    feed_entries,
+):
+    settings.BLOG_FEED_ENTRIES = feed_entries
+    rebuild_feeds()
+    user = author if logged_in else None
+    async_response = get_async(rf, url, user, page=page)
+    cache.clear()
+    sync_response = (author_client if logged_in else client).get(
+        url, {'page': page}
+    )
+
+    assert async_response.status_code == sync_response.status_code
+    assert without_csrf_token(async_response.content) == without_csrf_token(
+        sync_response.content
+    )
+
+
+@pytest.mark.usefixtures('create_many_posts')
+def test_async_view_serves_cached_page(rf, index_url):
+    first_response = get_async(rf, index_url)
+
+    with CaptureQueriesContext(connection) as context:
+        second_response = get_async(rf, index_url)
+
+    assert len(context.captured_queries) == 0
+    assert second_response.content == first_response.content
+
+
+@pytest.mark.usefixtures('create_many_posts')
+def test_async_view_cursor_pagination(rf, settings, index_url):
+    settings.BLOG_CURSOR_PAGINATION = True
+    first_page = get_async(rf, index_url).content.decode()
+    next_cursor = re.search(r'after=([\w-]+)', first_page)[1]
+
+    last_page = get_async(rf, index_url, after=next_cursor).content.decode()
+
+    assert first_page.count('<article') == POSTS_ON_PAGE
+    assert last_page.count('<article') == 1
+    with pytest.raises(Http404):
+        get_async(rf, index_url, after='garbage')
+
+
+@pytest.mark.parametrize(
+    'url',
+    (
+        lf('unpub_category_url'),
+        lf('unpub_post_url'),
+        '/profile/nobody/',
+    ),
+)
+def test_async_views_raise_not_found(rf, url):
+    with pytest.raises(Http404):
+        get_async(rf, url)
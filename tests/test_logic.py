@@ -1,13 +1,38 @@
+import importlib
+import threading
 from datetime import timedelta
+from io import BytesIO, StringIO
+from operator import itemgetter
 
 import pytest
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections
+from django.db.models import Count
+from django.templatetags.static import static
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image
 from pytest_django.asserts import assertRedirects
 from pytest_lazyfixture import lazy_fixture as lf
 
-from blog.models import Comment, Post
+from blog import feeds, transfer
+from blog.forms import PostForm
+from blog.images import create_renditions
+from blog.models import Comment, FeedEntry, Post
+from blog.templatetags.blog_tags import image_srcset
+from core import css, queue
+from core.checks import check_templates_compile
+from core.management.commands import build_css
+from core.models import Task
+from core.queue import task, work
+from core.timing import Histogram, request_stats
 
 User = get_user_model()
 
@@ -222,3 +247,610 @@ def test_user_can_delete(param_client, url, model, can_delete):
         assert model.objects.count() == old_count - 1
     else:
         assert model.objects.count() == old_count
+
+
+def test_comment_count_follows_comments(user_client, post, comment_add_url):
+    user_client.post(comment_add_url, data={'text': 'First'})
+    user_client.post(comment_add_url, data={'text': 'Second'})
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+    comment = post.comments.first()
+    comment.is_published = False
+    comment.save()
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+    post.comments.last().delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_recount_comments_command(post, comment):
+    Post.objects.update(comment_count=0)
+
+    call_command('recount_comments', stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+@pytest.mark.django_db
+def test_generate_data_command():
+    call_command(
+        'generate_data', users=50, posts=200, comments=1000, stdout=StringIO()
+    )
+    counts = dict(Post.objects.values_list('pk', 'comment_count'))
+
+    assert User.objects.count() == 50
+    assert len(counts) == 200
+    assert Comment.objects.count() > sum(counts.values()) > 0
+    assert Post.objects.update_comment_counts() == 200
+    assert dict(Post.objects.values_list('pk', 'comment_count')) == counts
+    assert Post.objects.get_scheduled().exists()
+    assert Post.objects.filter(category__is_published=False).exists()
+    # First authors and categories are the most active.
+    authors = list(Post.objects.values('author').annotate(posts=Count('pk')))
+    assert max(authors, key=itemgetter('posts'))['author'] == min(
+        item['author'] for item in authors
+    )
+    assert Post.objects.filter(category__slug='gen-category-0').count() > 20
+    with pytest.raises(CommandError):
+        call_command('generate_data', users=1, posts=1, comments=0)
+
+
+def test_content_import_restores_export_after_interruption(
+    tmp_path, post, comment
+):
+    dump = tmp_path / 'content.jsonl'
+    call_command('export_content', str(dump), stdout=StringIO())
+    rows = {
+        model: list(model.objects.order_by('pk').values())
+        for model in transfer.MODELS
+    }
+    User.objects.all().delete()
+    for model in transfer.MODELS:
+        model.objects.all().delete()
+    lines = dump.read_text(encoding='utf-8').splitlines(keepends=True)
+    interrupted = tmp_path / 'interrupted.jsonl'
+    interrupted.write_text(''.join(lines[:-2]), encoding='utf-8')
+
+    call_command('import_content', str(interrupted), stdout=StringIO())
+    call_command('import_content', str(dump), batch_size=1, stdout=StringIO())
+
+    assert {
+        model: list(model.objects.order_by('pk').values())
+        for model in transfer.MODELS
+    } == rows
+    with pytest.raises(CommandError):
+        call_command('import_content', str(tmp_path / 'missing.jsonl'))
+
+
+EXIF_ORIENTATION = 0x0112
+
+
+def _image_file(width: int, height: int) -> SimpleUploadedFile:
+    buffer = BytesIO()
+    Image.new('RGBA', (width, height), 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile('photo.png', buffer.getvalue(), 'image/png')
+
+
+def test_image_renditions_created_after_upload(
+    author_client,
+    post_form_data,
+    post_create_url,
+    settings,
+    tmp_path,
+):
+    settings.MEDIA_ROOT = tmp_path
+    Post.objects.all().delete()
+
+    author_client.post(
+        post_create_url,
+        data={**post_form_data, 'image': _image_file(1000, 500)},
+    )
+    assert not Post.objects.get().image_renditions
+    work(threads=1, burst=True)
+
+    post = Post.objects.get()
+    assert [width for width, _ in post.image_renditions['webp']] == [320, 640]
+    for extension in ('webp', 'jpeg'):
+        for width, name in post.image_renditions[extension]:
+            with Image.open(tmp_path / name) as rendition:
+                assert rendition.size == (width, width // 2)
+    assert image_srcset(post, 'jpeg') == ', '.join(
+        f'{post.image.storage.url(name)} {width}w'
+        for width, name in post.image_renditions['jpeg']
+    )
+
+
+def test_image_renditions_are_upright_and_opaque(post, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6  # Rotated by 90 degrees clockwise.
+    buffer = BytesIO()
+    Image.new('RGB', (1000, 500), 'red').save(
+        buffer, 'JPEG', exif=exif.tobytes()
+    )
+    post.image.save('photo.jpg', ContentFile(buffer.getvalue()))
+
+    [(width, name)] = create_renditions(post.pk)['jpeg']
+    with Image.open(tmp_path / name) as rendition:
+        assert rendition.size == (width, width * 2)
+
+    buffer = BytesIO()
+    Image.new('RGBA', (400, 400)).save(buffer, 'PNG')
+    post.image.save('transparent.png', ContentFile(buffer.getvalue()))
+
+    [(_, name)] = create_renditions(post.pk)['jpeg']
+    with Image.open(tmp_path / name) as rendition:
+        assert rendition.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_renditions_of_replaced_images_are_deleted(post, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    post.image.save('first.png', _image_file(1000, 500))
+    work(threads=1, burst=True)
+    post.refresh_from_db()
+    first_files = [
+        tmp_path / name for _, name in post.image_renditions['webp']
+    ]
+    assert all(path.exists() for path in first_files)
+
+    post.image.save('second.png', _image_file(1000, 500))
+    work(threads=1, burst=True)
+    post.refresh_from_db()
+    assert not any(path.exists() for path in first_files)
+
+    second_files = [
+        tmp_path / name for _, name in post.image_renditions['webp']
+    ]
+    post.delete()
+    work(threads=1, burst=True)
+    assert not any(path.exists() for path in second_files)
+
+
+def test_author_is_notified_about_comment(
+    settings, user_client, author, post, comment_add_url, mailoutbox
+):
+    settings.SITE_URL = 'https://blogicum.ru'
+    author.email = 'author@example.com'
+    author.save()
+
+    user_client.post(comment_add_url, data={'text': 'Nice post'})
+    work(threads=1, burst=True)
+
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].to == [author.email]
+    assert 'Nice post' in mailoutbox[0].body
+    assert f'https://blogicum.ru/posts/{post.pk}/' in mailoutbox[0].body
+
+
+def test_author_is_notified_about_comment_of_deleted_user(
+    user, user_client, author, comment_add_url, mailoutbox
+):
+    author.email = 'author@example.com'
+    author.save()
+
+    user_client.post(comment_add_url, data={'text': 'Nice post'})
+    user.delete()
+    work(threads=1, burst=True)
+
+    assert len(mailoutbox) == 1
+    assert 'удалённого пользователя' in mailoutbox[0].body
+    assert not Task.objects.filter(status=Task.Status.FAILED).exists()
+
+
+def _feed_scopes(post: Post) -> set[str]:
+    return set(post.feed_entries.values_list('scope', flat=True))
+
+
+def test_feed_entries_follow_visibility(settings, post, author, category):
+    settings.BLOG_FEED_ENTRIES = True
+    call_command('rebuild_feeds', stdout=StringIO())
+    visible_scopes = {
+        feeds.category_scope(category.pk),
+        feeds.author_scope(author.pk),
+    }
+    assert _feed_scopes(post) == visible_scopes
+
+    post.is_published = False
+    post.save()
+    assert not _feed_scopes(post)
+    post.is_published = True
+    post.save()
+    assert _feed_scopes(post) == visible_scopes
+
+    category.is_published = False
+    category.save()
+    assert not _feed_scopes(post)
+    category.is_published = True
+    category.save()
+    assert _feed_scopes(post) == visible_scopes
+
+    category.delete()
+    assert not FeedEntry.objects.exists()
+
+
+def test_scheduled_post_is_released(settings, delayed_post):
+    settings.BLOG_FEED_ENTRIES = True
+    delayed_post.save()
+    queued = Task.objects.filter(
+        name__endswith='release_scheduled_posts'
+    ).latest('pk')
+    assert queued.run_after == delayed_post.pub_date
+    assert not Post.objects.get_published().exists()
+
+    Task.objects.update(run_after=timezone.now())
+    work(threads=1, burst=True)
+    assert not Post.objects.filter(is_released=True).exists()
+    assert not _feed_scopes(delayed_post)
+
+    Post.objects.filter(pk=delayed_post.pk).update(pub_date=timezone.now())
+    call_command('release_posts', stdout=StringIO())
+    assert list(Post.objects.get_published()) == [delayed_post]
+    assert len(_feed_scopes(delayed_post)) == 2
+
+
+def test_release_is_queued_once(delayed_post):
+    delayed_post.save()
+    delayed_post.save()
+    call_command('release_posts', stdout=StringIO())
+    call_command('release_posts', stdout=StringIO())
+
+    assert (
+        Task.objects.filter(name__endswith='release_scheduled_posts').count()
+        == 1
+    )
+
+
+@task(max_attempts=2)
+def failing_task() -> None:
+    raise RuntimeError('Task failed')
+
+
+def test_failed_task_is_retried():
+    queued = failing_task.delay()
+
+    work(threads=1, burst=True)
+    queued.refresh_from_db()
+    assert queued.status == Task.Status.PENDING
+    assert queued.run_after > timezone.now()
+    assert 'Task failed' in queued.last_error
+
+    Task.objects.update(run_after=timezone.now())
+    work(threads=1, burst=True)
+    queued.refresh_from_db()
+    assert queued.status == Task.Status.FAILED
+    assert queued.attempts == 2
+
+
+def test_task_is_claimed_once(monkeypatch):
+    queued = failing_task.delay()
+    assert [claimed.pk for claimed in queue.claim_tasks(2)] == [queued.pk]
+
+    # Another worker selected the task before it was claimed.
+    monkeypatch.setattr(queue, '_due_task_ids', lambda now, limit: [queued.pk])
+    assert queue.claim_tasks(2) == []
+    queued.refresh_from_db()
+    assert queued.attempts == 1
+
+
+def test_worker_survives_locked_database(monkeypatch):
+    queued = failing_task.delay()
+    claim_tasks = queue.claim_tasks
+    errors = [OperationalError('database is locked')]
+
+    def flaky_claim_tasks(limit: int) -> list[Task]:
+        if errors:
+            raise errors.pop()
+        return claim_tasks(limit)
+
+    monkeypatch.setattr(queue, 'claim_tasks', flaky_claim_tasks)
+    assert work(threads=1, poll_interval=0, burst=True) == 1
+    queued.refresh_from_db()
+    assert queued.attempts == 1
+
+
+@task
+def stall_task(task_id: int) -> None:
+    Task.objects.filter(pk=task_id).update(
+        status=Task.Status.RUNNING,
+        run_after=timezone.now(),
+        locked_at=timezone.now() - queue.LOCK_TIMEOUT * 2,
+    )
+
+
+def test_running_worker_requeues_stale_tasks(monkeypatch):
+    monkeypatch.setattr(queue, 'MAINTENANCE_INTERVAL', timedelta(0))
+    stale = failing_task.delay(run_after=timezone.now() + timedelta(days=1))
+    stall_task.delay(stale.pk)
+
+    assert work(threads=1, poll_interval=0, burst=True) == 2
+    stale.refresh_from_db()
+    assert stale.status == Task.Status.PENDING
+    assert stale.attempts == 1
+
+
+def test_finished_tasks_are_deleted():
+    now = timezone.now()
+    statuses = (Task.Status.DONE, Task.Status.FAILED, Task.Status.PENDING)
+    for status in statuses:
+        for age in (timedelta(hours=1), timedelta(days=60)):
+            Task.objects.create(
+                name='blog.tasks.recount_comments',
+                status=status,
+                run_after=now - age,
+            )
+
+    assert queue.delete_finished_tasks() == 2
+    assert sorted(Task.objects.values_list('status', flat=True)) == sorted(
+        [Task.Status.DONE, Task.Status.FAILED, *[Task.Status.PENDING] * 2]
+    )
+
+
+quick_tasks_done = threading.Event()
+
+
+@task
+def slow_task() -> None:
+    if not quick_tasks_done.wait(timeout=5):
+        raise RuntimeError('Quick tasks waited for the slow one')
+
+
+@task
+def quick_task(last: bool) -> None:
+    if last:
+        quick_tasks_done.set()
+
+
+def test_slow_task_does_not_hold_up_others(monkeypatch):
+    # Results are not saved, threads can't write to the test database.
+    monkeypatch.setattr(
+        queue,
+        'run_task',
+        lambda queued: queue._registry[queued.name](*queued.args),
+    )
+    quick_tasks_done.clear()
+    slow_task.delay()
+    for i in range(4):
+        quick_task.delay(i == 3)
+
+    assert work(threads=2, poll_interval=0.01, burst=True) == 5
+    assert quick_tasks_done.is_set()
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_applied_on_connect(settings):
+    settings.SQLITE_PRAGMAS = {'synchronous': 'normal', 'busy_timeout': 1234}
+    connection = connections.create_connection('default')
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            synchronous = cursor.fetchone()[0]
+            cursor.execute('PRAGMA busy_timeout')
+            busy_timeout = cursor.fetchone()[0]
+    finally:
+        connection.close()
+
+    assert (synchronous, busy_timeout) == (1, 1234)
+
+
+def test_production_settings(monkeypatch, tmp_path):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'secret')
+    monkeypatch.setenv('DJANGO_ALLOWED_HOSTS', 'blogicum.ru,www.blogicum.ru')
+    monkeypatch.setenv('DJANGO_REDIS_URL', 'redis://cache:6379/1')
+    monkeypatch.delenv('DJANGO_CACHE_DIR', raising=False)
+
+    production = importlib.reload(
+        importlib.import_module('blogicum.settings_production')
+    )
+
+    assert not production.DEBUG
+    assert production.ALLOWED_HOSTS == ['blogicum.ru', 'www.blogicum.ru']
+    assert 'debug_toolbar' not in production.INSTALLED_APPS
+    assert not any('debug_toolbar' in name for name in production.MIDDLEWARE)
+    assert production.DATABASES['default']['CONN_MAX_AGE'] > 0
+    assert production.CACHES['default'] == {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://cache:6379/1',
+    }
+
+
+def test_production_file_cache_is_shared(monkeypatch, tmp_path):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'secret')
+    monkeypatch.setenv('DJANGO_ALLOWED_HOSTS', 'blogicum.ru')
+    monkeypatch.setenv('DJANGO_CACHE_DIR', str(tmp_path))
+
+    production = importlib.reload(
+        importlib.import_module('blogicum.settings_production')
+    )
+
+    # Version bumps of one process reach caches of the others.
+    config = production.CACHES['default']
+    backend = import_string(config['BACKEND'])
+    web, worker = (backend(config['LOCATION'], config) for _ in range(2))
+    worker.set('blog:version:feed:None', 2)
+    assert web.get('blog:version:feed:None') == 2
+
+
+def test_all_templates_compile():
+    assert check_templates_compile(None) == []
+
+
+def test_template_check_reports_broken_template(settings, tmp_path):
+    (tmp_path / 'broken.html').write_text('{% if %}')
+    settings.TEMPLATES = [{**settings.TEMPLATES[0], 'DIRS': [tmp_path]}]
+
+    errors = check_templates_compile(None)
+
+    assert [error.id for error in errors] == ['core.E001']
+    assert 'broken.html' in errors[0].msg
+
+
+COMPRESSED_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage'
+    },
+}
+
+
+@pytest.fixture(scope='session')
+def static_root(tmp_path_factory):
+    static_root = tmp_path_factory.mktemp('static')
+    with override_settings(
+        STATIC_ROOT=static_root,
+        STORAGES=COMPRESSED_STORAGES,
+        STATICFILES_FINDERS=[
+            'django.contrib.staticfiles.finders.FileSystemFinder'
+        ],
+    ):
+        call_command('collectstatic', interactive=False, verbosity=0)
+    return static_root
+
+
+@pytest.fixture
+def collected_static(settings, static_root):
+    settings.STATIC_ROOT = static_root
+    settings.STORAGES = COMPRESSED_STORAGES
+    return static_root
+
+
+def test_collectstatic_saves_compressed_variants(collected_static):
+    hashed_name = static('css/bootstrap.min.css').removeprefix('/static/')
+
+    assert hashed_name != 'css/bootstrap.min.css'
+    for name in (hashed_name, f'{hashed_name}.gz', f'{hashed_name}.br'):
+        assert (collected_static / name).is_file()
+
+
+@pytest.mark.parametrize(
+    'accept_encoding, content_encoding',
+    (
+        ('gzip, deflate, br', 'br'),
+        ('gzip, br;q=0', 'gzip'),
+        ('', None),
+    ),
+)
+def test_static_files_served_precompressed(
+    client, settings, collected_static, accept_encoding, content_encoding
+):
+    settings.MIDDLEWARE = [
+        'core.middleware.StaticFilesMiddleware',
+        *settings.MIDDLEWARE,
+    ]
+    url = static('css/bootstrap.min.css')
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/css'
+    assert response.get('Content-Encoding') == content_encoding
+    assert 'immutable' in response['Cache-Control']
+    assert 'max-age=60' in client.get('/static/css/style.css')['Cache-Control']
+
+
+def test_css_prune_keeps_only_used_rules():
+    stylesheet = (
+        '/*! License */.card,.unused{color:red}'
+        '.btn:not(.disabled):hover{color:blue}table{margin:0}'
+        '@media (min-width:576px){.unused{width:1px}.card{width:2px}}'
+        '@keyframes spin{to{transform:rotate(1turn)}}'
+    )
+
+    pruned = css.prune(css.parse(stylesheet), {'card', 'btn'})
+
+    assert css.serialize(pruned) == (
+        '/*! License */.card{color:red}'
+        '.btn:not(.disabled):hover{color:blue}'
+        '@media (min-width:576px){.card{width:2px}}'
+        '@keyframes spin{to{transform:rotate(1turn)}}'
+    )
+
+
+def test_built_stylesheets_are_up_to_date():
+    call_command('build_css', check=True)
+
+
+def test_build_css_keeps_classes_of_widgets(monkeypatch, settings):
+    widget = PostForm.base_fields['title'].widget
+    monkeypatch.setitem(widget.attrs, 'class', 'font-monospace fs-4')
+
+    assert {'font-monospace', 'fs-4'} <= build_css.find_widget_classes()
+    assert not any(
+        path.suffix == '.py' and path.is_relative_to(settings.BASE_DIR)
+        for path in build_css.find_content_files()
+    )
+
+
+@pytest.fixture
+def clean_request_stats():
+    request_stats.reset()
+    yield request_stats
+    request_stats.reset()
+
+
+@pytest.mark.parametrize('use_async', (False, True), ids=('wsgi', 'asgi'))
+def test_server_timing_reports_request(
+    author, author_client, post_detail_url, clean_request_stats, use_async
+):
+    author.is_staff = True
+    author.save()
+    with CaptureQueriesContext(connection) as queries:
+        if use_async:
+            async_client = AsyncClient()
+            async_client.cookies = author_client.cookies
+
+            async def get():
+                return await async_client.get(post_detail_url)
+
+            response = async_to_sync(get)()
+        else:
+            response = author_client.get(post_detail_url)
+
+    assert response.status_code == 200
+    metrics = dict(
+        item.strip().split(';', 1)
+        for item in response['Server-Timing'].split(',')
+    )
+    assert metrics.keys() == {'total', 'db', 'template'}
+    assert f'desc="{len(queries)} queries"' in metrics['db']
+    stats = clean_request_stats.as_dict()['blog:post_detail']
+    assert stats['queries']['count'] == 1
+    assert stats['queries']['max'] == len(queries)
+    assert 0 < stats['template']['max'] <= stats['total']['max']
+
+
+def test_server_timing_is_hidden_from_visitors(
+    client, post_detail_url, clean_request_stats
+):
+    response = client.get(post_detail_url)
+
+    assert not response.has_header('Server-Timing')
+    assert 'blog:post_detail' in clean_request_stats.as_dict()
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for value in (0.5, 3, 3, 4, 7000):
+        histogram.add(value)
+
+    assert histogram.percentile(0.5) == 5
+    assert histogram.percentile(0.99) == 7000
+    assert histogram.as_dict()['buckets']['5'] == 3
+
+
+def test_server_timings_visible_only_to_staff(
+    client, author, author_client, index_url, clean_request_stats
+):
+    url = reverse('server_timings')
+    client.get(index_url)
+
+    assert author_client.get(url).status_code == 403
+    author.is_staff = True
+    author.save()
+    response = author_client.get(url)
+
+    assert response.status_code == 200
+    assert response.json()['blog:index']['total']['count'] == 1
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from tests.query_budgets import QUERY_BUDGETS
+
+from blog.constants import POSTS_ON_PAGE
+from blog.models import Category, Comment, Location, Post
+from blog.urls import urlpatterns as blog_urlpatterns
+from pages.urls import urlpatterns as pages_urlpatterns
+
+
+@pytest.fixture(params=('small', 'large'))
+def dataset(request, django_user_model, author, post, comment) -> None:
+    """Content of the pages, either minimal or spread over many objects."""
+    if request.param == 'small':
+        return
+
+    users = django_user_model.objects.bulk_create(
+        django_user_model(username=f'reader_{i}') for i in range(5)
+    )
+    categories = Category.objects.bulk_create(
+        Category(title=f'Category {i}', slug=f'category-{i}', description='')
+        for i in range(3)
+    )
+    locations = Location.objects.bulk_create(
+        Location(name=f'Location {i}') for i in range(3)
+    )
+    now = timezone.now()
+    for i in range(POSTS_ON_PAGE * 2):
+        Post.objects.create(
+            title=f'Title {i}',
+            text='Text',
+            pub_date=now - timedelta(hours=i),
+            author=author if i % 2 else users[i % len(users)],
+            category=categories[i % len(categories)]
+            if i % 3
+            else post.category,
+            location=locations[i % len(locations)],
+        )
+    for i in range(POSTS_ON_PAGE):
+        Comment.objects.create(
+            text=f'Comment {i}', author=users[i % len(users)], post=post
+        )
+
+
+@pytest.fixture
+def page_urls(post, comment, author) -> dict[str, str]:
+    post_args = (post.pk,)
+    comment_args = (post.pk, comment.pk)
+    return {
+        'blog:index': reverse('blog:index'),
+        'blog:search': reverse('blog:search') + '?q=title',
+        'blog:category_posts': reverse(
+            'blog:category_posts', args=(post.category.slug,)
+        ),
+        'blog:profile': reverse('blog:profile', args=(author.username,)),
+        'blog:edit_profile': reverse('blog:edit_profile'),
+        'blog:post_detail': reverse('blog:post_detail', args=post_args),
+        'blog:create_post': reverse('blog:create_post'),
+        'blog:edit_post': reverse('blog:edit_post', args=post_args),
+        'blog:delete_post': reverse('blog:delete_post', args=post_args),
+        'blog:add_comment': reverse('blog:add_comment', args=post_args),
+        'blog:edit_comment': reverse('blog:edit_comment', args=comment_args),
+        'blog:delete_comment': reverse(
+            'blog:delete_comment', args=comment_args
+        ),
+        'pages:about': reverse('pages:about'),
+        'pages:rules': reverse('pages:rules'),
+    }
+
+
+def test_every_page_has_budget():
+    names = {
+        f'{app}:{pattern.name}'
+        for app, urlpatterns in (
+            ('blog', blog_urlpatterns),
+            ('pages', pages_urlpatterns),
+        )
+        for pattern in urlpatterns
+    }
+    assert names == set(QUERY_BUDGETS)
+
+
+@pytest.mark.usefixtures('dataset')
+@pytest.mark.parametrize('name', QUERY_BUDGETS)
+@pytest.mark.parametrize('logged_in', (False, True), ids=('anon', 'author'))
+def test_page_stays_within_query_budget(
+    client, author_client, page_urls, assert_query_budget, name, logged_in
+):
+    anonymous_budget, author_budget = QUERY_BUDGETS[name]
+    assert_query_budget(
+        author_client if logged_in else client,
+        page_urls[name],
+        author_budget if logged_in else anonymous_budget,
+    )
@@ -0,0 +1,83 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pytest_lazyfixture import lazy_fixture as lf
+
+from blog.feeds import rebuild_feeds
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='EXPLAIN QUERY PLAN output is SQLite specific.',
+)
+
+# Partial feed indexes hold only visible posts and the scheduled index
+# only scheduled ones, scanning them reads no others.
+FULL_SCAN = re.compile(
+    r'^SCAN blog_post\b'
+    r'(?!.* post_((published|category)_feed|scheduled)_idx$)'
+)
+
+
+def _query_plan(sql: str) -> list[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _post_queries(client, url: str, **params) -> list[str]:
+    with CaptureQueriesContext(connection) as context:
+        client.get(url, params)
+    return [
+        query['sql']
+        for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and '"blog_post"' in query['sql']
+    ]
+
+
+@pytest.mark.usefixtures('create_many_posts')
+@pytest.mark.parametrize('cursor_pagination', (False, True))
+@pytest.mark.parametrize(
+    'url, param_client',
+    (
+        (lf('index_url'), lf('client')),
+        (lf('category_url'), lf('client')),
+        (lf('a_profile_url'), lf('client')),
+        (lf('a_profile_url'), lf('author_client')),
+    ),
+)
+def test_feed_queries_use_indexes(
+    settings, url, param_client, cursor_pagination
+):
+    settings.BLOG_CURSOR_PAGINATION = cursor_pagination
+    queries = _post_queries(param_client, url)
+    assert queries
+
+    for sql in queries:
+        plan = _query_plan(sql)
+        scans = [step for step in plan if FULL_SCAN.match(step)]
+        assert not scans, f'Full table scan of posts:\n{sql}\n{plan}'
+
+
+@pytest.mark.usefixtures('create_many_posts')
+@pytest.mark.parametrize('cursor_pagination', (False, True))
+@pytest.mark.parametrize('url', (lf('category_url'), lf('a_profile_url')))
+def test_feed_entries_read_by_index_range(
+    settings, client, url, cursor_pagination
+):
+    settings.BLOG_CURSOR_PAGINATION = cursor_pagination
+    settings.BLOG_FEED_ENTRIES = True
+    rebuild_feeds()
+    queries = [
+        sql for sql in _post_queries(client, url) if '"blog_feedentry"' in sql
+    ]
+    assert queries
+
+    for sql in queries:
+        plan = _query_plan(sql)
+        assert any('feed_entry_range_idx' in step for step in plan), plan
+        assert not any(FULL_SCAN.match(step) for step in plan), plan
+        # Page-number pages sort only the posts of the page.
+        if cursor_pagination:
+            assert not any('TEMP B-TREE' in step for step in plan), plan
@@ -1,6 +1,7 @@
 from http import HTTPStatus
 
 import pytest
+from django.urls import reverse
 from pytest_django.asserts import assertRedirects
 from pytest_lazyfixture import lazy_fixture as lf
 
@@ -15,6 +16,7 @@ NOT_FOUND = HTTPStatus.NOT_FOUND
         (lf('category_url'), lf('client'), OK),
         (lf('post_detail_url'), lf('client'), OK),
         (lf('user_profile_url'), lf('client'), OK),
+        (lf('search_url'), lf('client'), OK),
         (lf('profile_edit_url'), lf('user_client'), OK),
         (lf('post_create_url'), lf('user_client'), OK),
         (lf('post_edit_url'), lf('author_client'), OK),
@@ -67,3 +69,11 @@ def test_redirects_to_login(client, url, login_url):
 def test_redirects_to_post_detail(user_client, url, post_detail_url):
     response = user_client.get(url)
     assertRedirects(response, post_detail_url)
+
+
+@pytest.mark.parametrize('name', ('blog:edit_comment', 'blog:delete_comment'))
+def test_comment_of_another_post_not_found(
+    author_client, comment, delayed_post, name
+):
+    url = reverse(name, args=(delayed_post.id, comment.id))
+    assert author_client.get(url).status_code == NOT_FOUND